@@ -1,10 +1,10 @@
 from .models import Product, FilterSpec, ChatRequest, ChatResponse, ProductsResponse
-from .router import classify_intent, extract_filters_rules, extract_filters_llm_or_rules, smalltalk_reply
-from .tools import CatalogIndex, apply_filters
+from .router import TextCtx, classify_intent, extract_filters_rules, extract_filters_rules_batch, extract_filters_llm_or_rules, smalltalk_reply
+from .tools import CatalogIndex, apply_filters, apply_filters_fast
 
 __all__ = [
     'Product','FilterSpec','ChatRequest','ChatResponse','ProductsResponse',
-    'classify_intent','extract_filters_rules','extract_filters_llm_or_rules','smalltalk_reply',
-    'CatalogIndex','apply_filters'
+    'TextCtx','classify_intent','extract_filters_rules','extract_filters_rules_batch','extract_filters_llm_or_rules','smalltalk_reply',
+    'CatalogIndex','apply_filters','apply_filters_fast'
 ]
 
@@ -1,19 +1,148 @@
 from __future__ import annotations
+import os
 from typing import List
 import torch
 import numpy as np
 from PIL import Image
 from sentence_transformers import SentenceTransformer
 
+# Optional: ONNX Runtime text encoder, enabled with USE_ONNX=1
+try:  # pragma: no cover
+    import onnxruntime as ort  # type: ignore
+except Exception:  # pragma: no cover
+    ort = None  # type: ignore
+
+# Exported ONNX graphs are cached next to the catalog data
+_ONNX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+_CLIP_MAX_TOKENS = 77
+
+def _cpu_supports_bf16() -> bool:
+    # oneDNN reports whether this CPU has native bfloat16 kernels
+    try:
+        return bool(torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
+
+class _CLIPTextTower(torch.nn.Module):
+    # Thin wrapper so torch.onnx.export traces only the projected text features
+    def __init__(self, clip_model):
+        super().__init__()
+        self.clip_model = clip_model
+
+    def forward(self, input_ids, attention_mask):
+        return self.clip_model.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+class _OnnxTextEncoder:
+    """CLIP text tower served through ONNX Runtime
+
+    The graph is exported once from the SentenceTransformer weights and cached on disk
+    Tokenization uses the model's fast tokenizer and normalization happens in NumPy
+    """
+
+    def __init__(self, st_model: SentenceTransformer, onnx_path: str):
+        clip = st_model[0]
+        self.tokenizer = clip.processor.tokenizer
+        if not os.path.isfile(onnx_path):
+            self._export(clip.model, onnx_path)
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        available = ort.get_available_providers()
+        providers = [p for p in ("CUDAExecutionProvider", "CPUExecutionProvider") if p in available]
+        self.session = ort.InferenceSession(onnx_path, sess_options=opts, providers=providers)
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+    def _export(self, clip_model, onnx_path: str) -> None:
+        os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+        dummy = self.tokenizer(["a photo of a product"], padding=True, truncation=True,
+                               max_length=_CLIP_MAX_TOKENS, return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                _CLIPTextTower(clip_model.eval()),
+                (dummy["input_ids"], dummy["attention_mask"]),
+                onnx_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["text_embeds"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "seq"},
+                    "attention_mask": {0: "batch", 1: "seq"},
+                    "text_embeds": {0: "batch"},
+                },
+                opset_version=14,
+            )
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        parts = []
+        for start in range(0, len(texts), batch_size):
+            tok = self.tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                                 max_length=_CLIP_MAX_TOKENS, return_tensors="np")
+            (embs,) = self.session.run(None, {
+                "input_ids": tok["input_ids"].astype(np.int64),
+                "attention_mask": tok["attention_mask"].astype(np.int64),
+            })
+            parts.append(embs)
+        embs = np.concatenate(parts) if parts else np.zeros((0, self.dim), dtype=np.float32)
+        embs = embs / (np.linalg.norm(embs, axis=1, keepdims=True) + 1e-12)
+        return embs.astype("float32")
+
 class CLIPEncoder:
     def __init__(self, model_name: str = "clip-ViT-B-32"):
+        # Pin intra op threads explicitly; CLIP inference stops scaling past ~8 cores
+        torch.set_num_threads(int(os.environ.get("TORCH_NUM_THREADS", min(8, os.cpu_count() or 1))))
         # One model supports both text and image
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
+        # Text can run through ONNX Runtime instead; images always stay on torch
+        # Export happens before any precision cast so the graph is full fp32
+        self._onnx_text: _OnnxTextEncoder | None = None
+        if os.environ.get("USE_ONNX") == "1":
+            if ort is None:
+                raise ImportError("onnxruntime is required when USE_ONNX=1; pip install onnxruntime")
+            onnx_path = os.environ.get("ONNX_TEXT_MODEL_PATH", os.path.join(_ONNX_DIR, f"{model_name}-text.onnx"))
+            self._onnx_text = _OnnxTextEncoder(self.model, onnx_path)
+        # Reduced precision halves weight bandwidth where the hardware supports it
+        # Opt in with CLIP_HALF_PRECISION=1; it shifts embeddings slightly, so rebuild
+        # the on disk embedding cache after switching
+        self.precision = "fp32"
+        if os.environ.get("CLIP_HALF_PRECISION", "0") == "1":
+            if torch.cuda.is_available():
+                self.model.half()
+                self.precision = "fp16"
+            elif _cpu_supports_bf16():
+                try:
+                    self.model = self.model.to(torch.bfloat16)
+                    self.precision = "bf16"
+                except Exception:
+                    pass
+
+    @property
+    def text_variant(self) -> str:
+        """Backend and precision that produce text embeddings, e.g. "torch-bf16"
+
+        Disk caches of text vectors key on this so a switch invalidates them
+        """
+        if self._onnx_text is not None:
+            return "onnx-fp32"  # exported before any precision cast
+        return f"torch-{self.precision}"
 
     def encode_text(self, texts: List[str]) -> np.ndarray:
+        if self._onnx_text is not None:
+            return self._onnx_text.encode(texts)
         embs = self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
         return embs.astype("float32")
 
+    def encode_text_batch(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        # Bulk corpus encoding with an explicit batch size so the model stays saturated
+        if self._onnx_text is not None:
+            return self._onnx_text.encode(texts, batch_size=batch_size)
+        embs = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return embs.astype("float32")
+
     def encode_image(self, image: Image.Image) -> np.ndarray:
         # Ensure consistent shape by always batching a single image
         emb = self.model.encode([image], normalize_embeddings=True, convert_to_numpy=True)
@@ -7,26 +7,47 @@ When an Ollama model is available we use it for light extraction and small talk
 
 from __future__ import annotations
 import os, re, json, random
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Literal
+from typing import Iterable, List, Literal, Union
 from .models import FilterSpec
 
 AGENT_NAME = os.environ.get("AGENT_NAME", "AI Commerce Agent")
 
-def classify_intent(text: str, has_image: bool) -> Literal["IMAGE_AND_TEXT","IMAGE_SEARCH","TEXT_RECOMMEND","SMALLTALK"]:
+@dataclass(frozen=True)
+class TextCtx:
+    """One user turn lowercased and tokenized once
+
+    Build it per request and pass it to the router helpers and the keyword fallback
+    """
+    raw: str
+    lc: str
+    tokens: frozenset
+
+    @classmethod
+    def from_text(cls, text: str | None) -> "TextCtx":
+        raw = text or ""
+        lc = raw.lower().strip()
+        tokens = frozenset(''.join(c if c.isalnum() else ' ' for c in lc).split())
+        return cls(raw=raw, lc=lc, tokens=tokens)
+
+TextLike = Union[str, TextCtx, None]
+
+def _ctx(text: TextLike) -> TextCtx:
+    return text if isinstance(text, TextCtx) else TextCtx.from_text(text)
+
+def classify_intent(text: TextLike, has_image: bool) -> Literal["IMAGE_AND_TEXT","IMAGE_SEARCH","TEXT_RECOMMEND","SMALLTALK"]:
     """Resolve a coarse intent for the turn
 
     Keep this conservative so later filtering can still shape the final answer
     """
     # This is probably the most important function in the whole router
     # It decides what the user actually wants to do with their input
-    t_raw = text or ""
-    t = t_raw.lower().strip()
+    t = _ctx(text).lc
     if has_image and len(t) > 2:
         return "IMAGE_AND_TEXT"  # They uploaded a pic AND wrote something meaningful
     if has_image:
         return "IMAGE_SEARCH"  # Just a picture, no real text to work with
-    t = text.lower().strip()
     # These are the magic words that tell us someone wants to shop
     shopping_signals = [
         "recommend", "find me", "suggest", "looking for", "buy", "show me", "search for", "compare"
@@ -44,36 +65,54 @@ BRANDS = [
     "Columbia","The North Face","Arcteryx","Samsonite","Herschel","Deuter","Salomon"
 ]
 
+# One pass over the text covers the keyword price expressions
+_PRICE_RE = re.compile(
+    r"(?P<between>(?:between|from)\s*\$?(?P<b_lo>\d+)\s*(?:and|-|to)\s*\$?(?P<b_hi>\d+))"
+    r"|(?P<under>(?:under|less than|below)\s*\$?(?P<u_max>\d+))",
+    re.I,
+)
+# Dash ranges get their own search, in the alternation a keyword match would
+# swallow the number they need ("under 20-40")
+_DASH_RE = re.compile(r"\$?(\d+)\s*-\s*\$?(\d+)")
+
 def _parse_price(text: str):
     """Parse a price band from free text
 
     Supports expressions like under 30 between 20 and 40 and ranges with a dash
     """
-    t = text.lower()
-    price_min = None
-    price_max = None
-    # Handle "under $50" or "less than 30"  pretty straightforward
-    m = re.search(r"(under|less than|below)\s*\$?(\d+)", t)
-    if m:
-        price_max = float(m.group(2))  # Just grab that number
-    # "between 20 and 40" or "from 10 to 25" gotta handle both orders
-    m = re.search(r"(between|from)\s*\$?(\d+)\s*(and|-|to)\s*\$?(\d+)", t)
-    if m:
-        a = float(m.group(2)); b = float(m.group(4))
-        price_min, price_max = min(a,b), max(a,b)  # Don't assume they'll put lower first
-    # range like 20 to 40
-    m = re.search(r"\$?(\d+)\s*-\s*\$?(\d+)", t)
-    if m:
-        a = float(m.group(1)); b = float(m.group(2))
-        price_min, price_max = min(a,b), max(a,b)
-    return price_min, price_max
+    under = between = None
+    for m in _PRICE_RE.finditer(text):
+        # Keep the first hit of each kind
+        if m.group("under") and under is None:
+            under = float(m.group("u_max"))  # "under $50" or "less than 30"
+        elif m.group("between") and between is None:
+            between = (float(m.group("b_lo")), float(m.group("b_hi")))
+    m = _DASH_RE.search(text)
+    dash = (float(m.group(1)), float(m.group(2))) if m else None
+    # An explicit band wins over a bare ceiling, and a dash range wins over between/from
+    band = dash or between
+    if band:
+        a, b = band
+        return min(a, b), max(a, b)  # Don't assume they'll put lower first
+    return None, under
+
+def _keyword_regex(keys) -> re.Pattern:
+    """Compile a vocabulary into one case insensitive alternation
+
+    Longest keys go first so multi word phrases win over their parts
+    and an optional plural or possessive suffix is allowed on whole words
+    """
+    alternation = "|".join(re.escape(k) for k in sorted(keys, key=len, reverse=True))
+    return re.compile(r"\b(" + alternation + r")(?:'?s)?\b", re.I)
+
+_BRAND_BY_KEY = {b.lower(): b for b in BRANDS}
+_BRAND_RE = _keyword_regex(_BRAND_BY_KEY)
 
 def _parse_brand(text: str):
-    # Just do a simple substring search works surprisingly well
-    for b in BRANDS:
-        if b.lower() in text.lower():
-            return b
-    return None  
+    # One regex pass over the text instead of a substring scan per brand
+    m = _BRAND_RE.search(text)
+    return _BRAND_BY_KEY[m.group(1).lower()] if m else None
+
 TAG_MAP = {
     "breathable":"breathable",
     "lightweight":"lightweight",
@@ -100,96 +139,134 @@ TAG_MAP = {
     "noise cancelling":"noise-cancelling",
     "cushioning":"cushioning",
 }
+_TAG_RE = _keyword_regex(TAG_MAP)
+
+CATEGORY_SYNONYMS = [
+    ("t-shirt", ["t-shirt","tee","shirt","tshirt"]),
+    ("hoodie", ["hoodie","hooded"]),
+    ("shorts", ["shorts"]),
+    ("sneakers", ["sneakers","running shoes","trainers","shoes"]),
+    ("backpack", ["backpack","bag","daypack"]),
+    ("headphones", ["headphones","headset","over-ear","on-ear","noise cancelling"]),
+    ("jacket", ["jacket","shell","windbreaker","rain jacket","coat"]),
+    ("leggings", ["leggings","tights"]),
+    ("socks", ["socks"]),
+    ("cap", ["cap","hat","beanie"]),
+]
+_CATEGORY_BY_KEY = {k: canonical for canonical, keys in CATEGORY_SYNONYMS for k in keys}
+_CATEGORY_RE = _keyword_regex(_CATEGORY_BY_KEY)
 
-def extract_filters_rules(text: str) -> FilterSpec:
+def extract_filters_rules(text: TextLike) -> FilterSpec:
     """Return a FilterSpec using only rules and simple matching"""
-    t = text.lower()
+    ctx = _ctx(text)
+    t = ctx.lc
     price_min, price_max = _parse_price(t)
-    brand = _parse_brand(text)
-    category = None
-    CATEGORY_SYNONYMS = [
-        ("t-shirt", ["t-shirt","tee","shirt","tshirt"]),
-        ("hoodie", ["hoodie","hooded"]),
-        ("shorts", ["shorts"]),
-        ("sneakers", ["sneakers","running shoes","trainers","shoes"]),
-        ("backpack", ["backpack","bag","daypack"]),
-        ("headphones", ["headphones","headset","over-ear","on-ear","noise cancelling"]),
-        ("jacket", ["jacket","shell","windbreaker","rain jacket","coat"]),
-        ("leggings", ["leggings","tights"]),
-        ("socks", ["socks"]),
-        ("cap", ["cap","hat","beanie"]),
-    ]
-    for canonical, keys in CATEGORY_SYNONYMS:
-        if any(k in t for k in keys):
-            category = canonical
-            break
-    tags_contains = None
-    for k, v in TAG_MAP.items():
-        if k in t:
-            tags_contains = v; break
+    brand = _parse_brand(ctx.raw)
+    m = _CATEGORY_RE.search(t)
+    category = _CATEGORY_BY_KEY[m.group(1)] if m else None
+    m = _TAG_RE.search(t)
+    tags_contains = TAG_MAP[m.group(1)] if m else None
     return FilterSpec(brand=brand, category=category, price_min=price_min, price_max=price_max, tags_contains=tags_contains)
 
-def extract_filters_llm_or_rules(text: str) -> FilterSpec:
+def extract_filters_rules_batch(texts: Iterable[TextLike]) -> List[FilterSpec]:
+    """extract_filters_rules over many queries in one pass
+
+    The patterns are compiled once at import so this is just the scan per text
+    Repeated queries are parsed once and share the same FilterSpec so treat the results as read only
+    """
+    seen = {}
+    out = []
+    for text in texts:
+        spec = seen.get(text)
+        if spec is None:
+            spec = seen[text] = extract_filters_rules(text)
+        out.append(spec)
+    return out
+
+def extract_filters_llm_or_rules(text: TextLike) -> FilterSpec:
     """Return a FilterSpec using rules only
 
     The project is fully deterministic and does not rely on an external model
     """
     return extract_filters_rules(text)
 
-def smalltalk_reply(text: str) -> str:
-    """Friendly small talk that keeps the conversation in scope
+_JOKES = [
+    "Why did the web developer go broke? Because they used up all their cache.",
+    "I told my sneakers a joke. They were laced with laughter.",
+    "Why do shirts love autumn? Because it’s the best season to layer.",
+]
 
-    With an Ollama model configured we ask for a short natural sentence
-    Without a model we use a small set of curated replies
-    """
-    t = (text or "").lower().strip()
 
-    # Greetings
-    if any(g in t for g in ["hi", "hello", "hey", "yo", "good morning", "good afternoon", "good evening"]):
-        return f"Hi! I'm {AGENT_NAME}. How can I help today?"
+def _phrases(*phrases: str) -> "re.Pattern[str] | None":
+    if not phrases:
+        return None
+    return re.compile("|".join(r"\b" + re.escape(p) + r"\b" for p in phrases))
 
-    # Name / identity
-    if any(k in t for k in ["what's your name", "what is your name", "your name", "who are you", "introduce yourself"]):
-        return f"I'm {AGENT_NAME}. Your AI shopping buddy for our catalog."
 
+# Small talk intents in priority order
+# Each entry is (single words, multi word phrases, reply) and the first intent
+# that hits either a whole token or a phrase wins
+_INTENTS = [
+    # Greetings
+    (frozenset({"hi", "hello", "hey", "yo"}),
+     _phrases("good morning", "good afternoon", "good evening"),
+     lambda: f"Hi! I'm {AGENT_NAME}. How can I help today?"),
+    # Name / identity
+    (frozenset(),
+     _phrases("your name", "who are you", "introduce yourself"),
+     lambda: f"I'm {AGENT_NAME}. Your AI shopping buddy for our catalog."),
     # Capabilities
-    if any(k in t for k in ["what can you do", "capabilities", "how can you help", "help", "what do you do"]):
-        return (
-            "I can chat, recommend products from our catalog, and search by image. "
-            "Try: ‘recommend breathable t‑shirts under $30’ or upload a photo and say ‘like this but cheaper’."
-        )
-
+    (frozenset({"capabilities", "help"}),
+     _phrases("what can you do", "what do you do"),
+     lambda: (
+         "I can chat, recommend products from our catalog, and search by image. "
+         "Try: ‘recommend breathable t‑shirts under $30’ or upload a photo and say ‘like this but cheaper’."
+     )),
     # Gratitude / sign‑off
-    if any(k in t for k in ["thank you", "thanks", "thx", "ty"]):
-        return "You're welcome! If you want more ideas, just ask."
-    if any(k in t for k in ["bye", "goodbye", "see you", "later"]):
-        return "Bye for now! Happy shopping."
-
+    (frozenset({"thanks", "thx", "ty"}),
+     _phrases("thank you"),
+     lambda: "You're welcome! If you want more ideas, just ask."),
+    (frozenset({"bye", "goodbye", "later"}),
+     _phrases("see you"),
+     lambda: "Bye for now! Happy shopping."),
     # How are you
-    if "how are you" in t or "how's it going" in t or "hows it going" in t:
-        return "Doing well, thanks! Ready to help you find great picks."
-
+    (frozenset(),
+     _phrases("how are you", "how's it going", "hows it going"),
+     lambda: "Doing well, thanks! Ready to help you find great picks."),
     # Time / date (local server time)
-    if any(k in t for k in ["what time", "current time", "date", "what's the time", "time is it"]):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M")
-        return f"It's {now} (server time)."
-
+    (frozenset({"date"}),
+     _phrases("what time", "current time", "what's the time", "time is it"),
+     lambda: f"It's {datetime.now().strftime('%Y-%m-%d %H:%M')} (server time)."),
     # Jokes / fun
-    if "joke" in t:
-        jokes = [
-            "Why did the web developer go broke? Because they used up all their cache.",
-            "I told my sneakers a joke. They were laced with laughter.",
-            "Why do shirts love autumn? Because it’s the best season to layer.",
-        ]
-        return random.choice(jokes)
-
+    (frozenset({"joke", "jokes"}),
+     None,
+     lambda: random.choice(_JOKES)),
     # Preferences / trivia
-    if "favorite color" in t or "favourite colour" in t:
-        return "Emerald green — goes well with dark mode."
-    if "where are you" in t or "where do you live" in t:
-        return "I live in the cloud, close to your shopping cart."
-    if any(k in t for k in ["who made you", "who created you", "who built you"]):
-        return "I was built by your team using FastAPI, CLIP embeddings, and Next.js."
+    (frozenset(),
+     _phrases("favorite color", "favourite colour"),
+     lambda: "Emerald green — goes well with dark mode."),
+    (frozenset(),
+     _phrases("where are you", "where do you live"),
+     lambda: "I live in the cloud, close to your shopping cart."),
+    (frozenset(),
+     _phrases("who made you", "who created you", "who built you"),
+     lambda: "I was built by your team using FastAPI, CLIP embeddings, and Next.js."),
+]
+
+
+def smalltalk_reply(text: TextLike) -> str:
+    """Friendly small talk that keeps the conversation in scope
+
+    With an Ollama model configured we ask for a short natural sentence
+    Without a model we use a small set of curated replies
+    Words are matched as whole tokens so "this" does not count as "hi"
+    """
+    ctx = _ctx(text)
+    t = ctx.lc
+
+    for words, phrase_re, reply in _INTENTS:
+        if not words.isdisjoint(ctx.tokens) or (phrase_re is not None and phrase_re.search(t)):
+            return reply()
 
     # No external model. Continue with a friendly default
 
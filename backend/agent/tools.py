@@ -1,6 +1,9 @@
 from __future__ import annotations
-import os, json, csv
-from typing import List, Tuple, Optional, TYPE_CHECKING
+import os, json, csv, functools, mmap
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple, Optional, TYPE_CHECKING
 import numpy as np
 import pandas as pd
 from PIL import Image
@@ -16,45 +19,169 @@ if TYPE_CHECKING:  # only for type hints
 
 from .models import Product, FilterSpec
 
-def _compose_text(row: pd.Series) -> str:
-    # Create a single text string from all product fields for embedding
-    return f"{row['title']} | {row['description']} | category: {row['category']} | brand: {row['brand']} | tags: {row['tags']}"
+# Catalogs at least this large use an HNSW graph instead of exhaustive search
+HNSW_MIN_ROWS = int(os.environ.get("HNSW_MIN_ROWS", 5000))
+# Graph degree and build/search beam widths; higher trades latency for recall
+HNSW_M = int(os.environ.get("HNSW_M", 32))
+HNSW_EF_CONSTRUCTION = int(os.environ.get("HNSW_EF_CONSTRUCTION", 200))
+HNSW_EF_SEARCH = int(os.environ.get("HNSW_EF_SEARCH", 64))
+# Vector storage inside the FAISS index: fp32 is exact, fp16/int8 scalar
+# quantize the codes to cut memory bandwidth per query at a small recall cost
+INDEX_PRECISION = os.environ.get("INDEX_PRECISION", "fp32")
+_SQ_TYPES = {"fp32": None, "fp16": "QT_fp16", "int8": "QT_8bit"}
+# CLIP checkpoint behind every catalog and query embedding
+CLIP_MODEL_NAME = "clip-ViT-B-32"
+# Filters matching at most this many rows are scored exactly, skipping the ANN index
+EXACT_SUBSET_MAX_ROWS = 200
+# Catalogs larger than this are embedded across worker processes on first build
+PARALLEL_ENCODE_MIN_ROWS = 2000
 
-def _ensure_float32(a: np.ndarray) -> np.ndarray:
-    # FAISS is picky about data types so everything needs to be float32
-    if a.dtype != np.float32:
-        return a.astype('float32')
-    return a
+def _compose_texts(df: pd.DataFrame) -> List[str]:
+    # Create a single text string per product from all fields for embedding
+    # Vectorized column concatenation instead of a Python loop over rows
+    col = lambda c: df[c].astype(str)  # categorical columns do not support string concatenation
+    return (
+        col('title') + ' | ' + col('description')
+        + ' | category: ' + col('category')
+        + ' | brand: ' + col('brand')
+        + ' | tags: ' + col('tags')
+    ).tolist()
 
-def apply_filters(df: pd.DataFrame, f: FilterSpec) -> pd.DataFrame:
-    # Filter the dataframe based on user constraints
-    out = df
+_SHARD_ENCODER = None
+
+def _init_shard_worker(threads: int) -> None:
+    # Split the cores between workers instead of letting each one grab them all
+    os.environ["TORCH_NUM_THREADS"] = str(threads)
+
+def _encode_shard(texts: List[str]) -> np.ndarray:
+    # Runs in a worker process; the model is loaded once per worker
+    global _SHARD_ENCODER
+    if _SHARD_ENCODER is None:
+        from .embeddings import CLIPEncoder
+        _SHARD_ENCODER = CLIPEncoder(CLIP_MODEL_NAME)
+    return _SHARD_ENCODER.encode_text_batch(texts)
+
+def _encode_corpus(encoder: "CLIPEncoder", texts: List[str]) -> np.ndarray:
+    # Small corpora are not worth paying for extra model loads
+    cpus = os.cpu_count() or 1
+    workers = int(os.environ.get("EMBED_WORKERS", min(4, cpus // 2)))
+    if len(texts) <= PARALLEL_ENCODE_MIN_ROWS or workers < 2:
+        return encoder.encode_text_batch(texts)
+    # Contiguous shards so each worker keeps the similar length batches it was given
+    bounds = np.linspace(0, len(texts), workers + 1).astype(int)
+    shards = [texts[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    # Spawn so workers never inherit torch or FAISS thread state from a fork
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_shard_worker,
+        initargs=(max(1, cpus // workers),),
+    ) as pool:
+        parts = list(pool.map(_encode_shard, shards))
+    return np.concatenate(parts)
+
+def _dedup_norm(s: str) -> str:
+    return ''.join(ch for ch in s.lower() if ch.isalnum() or ch.isspace()).strip()
+
+def _advise_random(a: np.ndarray) -> None:
+    # madvise(MADV_RANDOM) on a np.load(mmap_mode=...) array where the platform supports it
+    mm = getattr(a, "_mmap", None)
+    if mm is None or not hasattr(mmap, "MADV_RANDOM"):
+        return
+    try:
+        mm.madvise(mmap.MADV_RANDOM)
+    except (OSError, ValueError):
+        pass
+
+def _to_shared(a: np.ndarray) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    # Copy an array into a named shared memory block and return a view onto it
+    shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+    view = np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)
+    view[...] = a
+    return shm, view
+
+def _filter_mask(brand_lc: np.ndarray, category_lc: np.ndarray, price: np.ndarray, tags_lc: np.ndarray, f: FilterSpec) -> np.ndarray:
+    # Combine every constraint into one boolean mask over lowercased column arrays
+    mask = np.ones(len(price), dtype=bool)
     if f.brand:
-        out = out[out["brand"].str.lower() == f.brand.lower()]  
+        mask &= brand_lc == f.brand.lower()
     if f.category:
-        out = out[out["category"].str.contains(f.category, case=False, na=False)] 
+        mask &= np.char.find(category_lc, f.category.lower()) >= 0
     if f.price_min is not None:
-        out = out[out["price"] >= float(f.price_min)]
+        mask &= price >= float(f.price_min)
     if f.price_max is not None:
-        out = out[out["price"] <= float(f.price_max)]  
+        mask &= price <= float(f.price_max)
     if f.tags_contains:
-        out = out[out["tags"].str.contains(f.tags_contains, case=False, na=False)]  
-    return out
+        mask &= np.char.find(tags_lc, f.tags_contains.lower()) >= 0
+    return mask
+
+def apply_filters(df: pd.DataFrame, f: FilterSpec) -> pd.DataFrame:
+    # Filter the dataframe based on user constraints, slicing only once at the end
+    # Catalog frames carry pre lowercased *_lc columns; plain frames are lowered here
+    def lowered(col: str) -> np.ndarray:
+        src = df[f"{col}_lc"] if f"{col}_lc" in df.columns else df[col].str.lower()
+        return src.to_numpy(dtype=str)
+    mask = _filter_mask(lowered("brand"), lowered("category"), df["price"].to_numpy(dtype=float), lowered("tags"), f)
+    return df[mask]
+
+def embedding_cache_paths(csv_path: str) -> Tuple[str, str]:
+    # Precomputed catalog embeddings and the ids they belong to
+    cache_dir = os.path.dirname(csv_path)
+    emb_path = os.environ.get("EMBEDDINGS_PATH", os.path.join(cache_dir, "catalog_embeddings.npy"))
+    return emb_path, os.path.join(cache_dir, "catalog_ids.json")
+
+def apply_filters_fast(records: List[Dict[str, Any]], f: FilterSpec) -> List[Dict[str, Any]]:
+    # Same rules as apply_filters over a plain list of product dicts, for tiny
+    # catalogs and small batches where building a DataFrame costs more than the filtering
+    brand = f.brand.lower() if f.brand else None
+    category = f.category.lower() if f.category else None
+    tags = f.tags_contains.lower() if f.tags_contains else None
+    price_min = float(f.price_min) if f.price_min is not None else None
+    price_max = float(f.price_max) if f.price_max is not None else None
+    return [
+        r for r in records
+        if (brand is None or str(r["brand"]).lower() == brand)
+        and (category is None or category in str(r["category"]).lower())
+        and (price_min is None or float(r["price"]) >= price_min)
+        and (price_max is None or float(r["price"]) <= price_max)
+        and (tags is None or tags in str(r["tags"]).lower())
+    ]
 
 class CatalogIndex:
-    def __init__(self, csv_path: str):
+    def __init__(self, csv_path: str, shared: bool = False, precision: Optional[str] = None):
         # Load the product catalog and build a searchable index
+        # shared=True keeps the embedding matrix in named shared memory so worker
+        # processes forked after construction map the same pages
+        # precision picks the FAISS code format (fp32/fp16/int8, default INDEX_PRECISION)
+        self.precision = precision or INDEX_PRECISION
+        if self.precision not in _SQ_TYPES:
+            raise ValueError(f"precision must be one of {sorted(_SQ_TYPES)}, got {self.precision!r}")
+        self._shm: Optional[shared_memory.SharedMemory] = None
         if not os.path.isfile(csv_path):
             raise FileNotFoundError(csv_path)
         skipped_rows = 0
         bad_lines: list[int] = []
         try:
+            # Arrow strings live in contiguous buffers instead of one PyObject per cell
             self.df = pd.read_csv(
                 csv_path,
-                dtype=str,
+                dtype="string[pyarrow]",
                 keep_default_na=False,
-                engine="c",
+                engine="pyarrow",
+                dtype_backend="pyarrow",
             )
+        except (ImportError, ValueError):
+            # No pyarrow, or a CSV it can't parse (ArrowInvalid is a ValueError);
+            # the pandas parsers below handle the messy cases
+            self.df = None
+        try:
+            if self.df is None:
+                self.df = pd.read_csv(
+                    csv_path,
+                    dtype=str,
+                    keep_default_na=False,
+                    engine="c",
+                )
         except Exception:
             # Fallback parser more forgiving with quotes and escape characters
             try:
@@ -109,6 +236,9 @@ class CatalogIndex:
         for col in ["title","description","category","brand","currency","image_url","tags"]:
             if col not in self.df.columns:
                 self.df[col] = ""
+        # Low cardinality columns are dictionary encoded
+        for col in ("brand", "category", "currency"):
+            self.df[col] = self.df[col].astype("category")
         if skipped_rows or bad_lines:
             msg = f"[catalog] Loaded {len(self.df)} rows;"
             if skipped_rows:
@@ -120,23 +250,37 @@ class CatalogIndex:
             msg += " Please fix CSV formatting (quote fields containing commas)."
             print(msg)
 
+        # Lowercase the matchable text columns once instead of on every query
+        for col in ("brand", "category", "tags"):
+            self.df[f"{col}_lc"] = self.df[col].str.lower()
+        self._build_column_cache()
+
         # Set up the CLIP encoder lazily to avoid heavy imports during simple tests
         from .embeddings import CLIPEncoder  # local import
-        self.encoder = CLIPEncoder()
+        self.encoder = CLIPEncoder(CLIP_MODEL_NAME)
+        # Per index LRU over query encodes; popular queries skip the CLIP forward
+        self._encode_query_text = functools.lru_cache(maxsize=1024)(self._encode_query_text_uncached)
 
         # Try to load cached embeddings if they match this catalog
-        cache_dir = os.path.dirname(csv_path)
-        emb_path = os.environ.get("EMBEDDINGS_PATH", os.path.join(cache_dir, "catalog_embeddings.npy"))
-        ids_path = os.path.join(cache_dir, "catalog_ids.json")
+        emb_path, ids_path = embedding_cache_paths(csv_path)
         loaded = False
         try:
             if os.path.isfile(emb_path) and os.path.isfile(ids_path):
                 with open(ids_path, "r") as f:
                     ids = json.load(f)
-                embs = np.load(emb_path)
+                # Memory map so cold start only pages in what is touched
+                embs = np.load(emb_path, mmap_mode="r")
                 if len(ids) == len(self.df) and embs.shape[0] == len(self.df):
                     if list(self.df["id"].astype(str)) == ids:
-                        self.embeddings = embs.astype("float32")
+                        # Older caches were written as float32
+                        self.embeddings_fp16 = embs if embs.dtype == np.float16 else embs.astype("float16")
+                        # Upcast for FAISS and re normalize to undo half precision rounding
+                        embs32 = np.ascontiguousarray(embs, dtype=np.float32)
+                        embs32 /= np.linalg.norm(embs32, axis=1, keepdims=True) + 1e-12
+                        self.embeddings = embs32
+                        # The upcast above streamed the file once; after that only MMR
+                        # gathers scattered rows, so turn kernel read ahead off
+                        _advise_random(self.embeddings_fp16)
                         loaded = True
         except Exception:
             loaded = False
@@ -144,26 +288,129 @@ class CatalogIndex:
         if not loaded:
             # No cache hit so time to compute embeddings from scratch
             # This can take a while for large catalogs but only happens once
-            corpus = [ _compose_text(r) for _, r in self.df.iterrows() ]
-            self.embeddings = self.encoder.encode_text(corpus)  # shape (N, D)
+            corpus = _compose_texts(self.df)
+            # Duplicate listings share one encode; inverse maps each row back to its text
+            unique, inverse = np.unique(np.array(corpus), return_inverse=True)
+            texts = unique.tolist() if len(unique) < len(corpus) else corpus
+            # Encode in length order so each batch pads to similar lengths, then
+            # scatter rows back to catalog order (embeddings stay L2 normalized)
+            order = np.argsort([len(s) for s in texts], kind="stable")
+            embs = _encode_corpus(self.encoder, [texts[i] for i in order])
+            self.embeddings = np.empty_like(embs)  # shape (N, D) or (unique, D)
+            self.embeddings[order] = embs
+            if texts is not corpus:
+                self.embeddings = self.embeddings[inverse]
+            # CLIP similarities hold up in half precision, so the cache is stored as float16
+            self.embeddings_fp16 = self.embeddings.astype("float16")
             try:
-                np.save(emb_path, self.embeddings)
+                np.save(emb_path, self.embeddings_fp16)
                 with open(ids_path, "w") as f:
                     json.dump(list(self.df["id"].astype(str)), f)
             except Exception:
                 pass
+        # FAISS is picky about data types so settle on contiguous float32 once here
+        self.embeddings = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+        if shared:
+            try:
+                self._shm, self.embeddings = _to_shared(self.embeddings)
+            except OSError as e:  # e.g. /dev/shm too small inside a container
+                print(f"[catalog] Shared memory unavailable, keeping embeddings on the heap: {e}")
         # Build the FAISS index for fast similarity search
         # Inner product works well with normalized CLIP embeddings
         if faiss is None:
             raise ImportError(
                 "faiss-cpu is required for CatalogIndex; install backend requirements."
             )
-        self.index = faiss.IndexFlatIP(self.embeddings.shape[1])
-        self.index.add(_ensure_float32(self.embeddings))
-        self.id_map = list(self.df["id"].values)  # Keep track of which row is which
+        dim = self.embeddings.shape[1]
+        qtype = _SQ_TYPES[self.precision]
+        if qtype is not None:
+            qtype = getattr(faiss.ScalarQuantizer, qtype)
+        if len(self.df) >= HNSW_MIN_ROWS:
+            # Graph based ANN keeps query cost sub linear on large catalogs;
+            # self.embeddings is still kept for exact MMR rescoring
+            if qtype is None:
+                base = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            else:
+                base = faiss.IndexHNSWSQ(dim, qtype, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            base.hnsw.efSearch = HNSW_EF_SEARCH
+        elif qtype is None:
+            # Exhaustive search is faster than a graph walk for small catalogs
+            base = faiss.IndexFlatIP(dim)
+        else:
+            base = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_INNER_PRODUCT)
+        if not base.is_trained:
+            # Quantizers learn per dimension ranges from the catalog itself
+            base.train(self.embeddings)
+        # FAISS hands back catalog row numbers directly; product ids resolve through self._ids
+        self.index = faiss.IndexIDMap2(base)
+        self.index.add_with_ids(self.embeddings, np.arange(len(self.df), dtype=np.int64))
+
+    def _build_column_cache(self) -> None:
+        # Plain NumPy copies of the columns used for filtering so queries avoid pandas
+        self._brand_lc = self.df["brand_lc"].to_numpy(dtype=str)
+        self._category_lc = self.df["category_lc"].to_numpy(dtype=str)
+        self._tags_lc = self.df["tags_lc"].to_numpy(dtype=str)
+        self._price = self.df["price"].to_numpy(dtype=float)
+        self._ids = self.df["id"].to_numpy(dtype=object)
+        # O(1) product id -> row lookups; the first row wins if an id repeats
+        self.id_to_row: dict[str, int] = {}
+        for i, v in enumerate(self._ids.tolist()):
+            self.id_to_row.setdefault(str(v), i)
+        # Free text columns for the keyword fallback
+        self._title_lc = self.df["title"].astype(str).str.lower().to_numpy(dtype=str)
+        self._desc_lc = self.df["description"].astype(str).str.lower().to_numpy(dtype=str)
+        # Normalized (title, brand) per row for near duplicate suppression when picking results
+        self._dedup_keys = list(zip(
+            map(_dedup_norm, self.df["title"].astype(str).tolist()),
+            map(_dedup_norm, self.df["brand"].astype(str).tolist()),
+        ))
+
+    def __getstate__(self) -> dict:
+        # Pickle support for on disk caches; the encoder, query LRU and shared memory
+        # handle belong to this process and FAISS indexes have their own format
+        state = self.__dict__.copy()
+        for key in ("encoder", "_encode_query_text", "_shm"):
+            state.pop(key, None)
+        state["embeddings"] = np.array(self.embeddings)  # detached from any shared block
+        state["embeddings_fp16"] = np.asarray(self.embeddings_fp16)
+        state["index"] = faiss.serialize_index(self.index)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["index"] = faiss.deserialize_index(state["index"])
+        self.__dict__.update(state)
+        self._shm = None
+        from .embeddings import CLIPEncoder  # local import
+        self.encoder = CLIPEncoder(CLIP_MODEL_NAME)
+        self._encode_query_text = functools.lru_cache(maxsize=1024)(self._encode_query_text_uncached)
+
+    @property
+    def shm_name(self) -> Optional[str]:
+        """Name of the shared memory block holding the embeddings, if any"""
+        return self._shm.name if self._shm is not None else None
+
+    def close_shared(self, unlink: bool = False) -> None:
+        # Only the creating process should unlink the block
+        if self._shm is None:
+            return
+        self.embeddings = np.array(self.embeddings)
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+        self._shm = None
+
+    def filter_mask(self, f: FilterSpec) -> np.ndarray:
+        return _filter_mask(self._brand_lc, self._category_lc, self._price, self._tags_lc, f)
+
+    def apply_filters(self, f: FilterSpec) -> pd.DataFrame:
+        # Same semantics as the module level apply_filters on the cached columns
+        return self.df[self.filter_mask(f)]
 
     def _raw_search(self, query_emb: np.ndarray, fetch_k: int) -> Tuple[np.ndarray, np.ndarray]:
-        query = _ensure_float32(query_emb.reshape(1, -1))
+        # Encoders and stored rows are already float32 and contiguous, so this is
+        # a no-op view on the hot path and a copy only for odd inputs
+        query = np.ascontiguousarray(query_emb, dtype=np.float32).reshape(1, -1)
         scores, idxs = self.index.search(query, fetch_k)
         return scores[0], idxs[0]
 
@@ -171,101 +418,123 @@ class CatalogIndex:
         # Maximal Marginal Relevance - avoid showing too many similar products
         # Balance relevance vs diversity so users don't see 8 identical t-shirts
         selected: List[int] = []
-        query_vec = query_vec.reshape(1, -1)
-        item_vecs = self.embeddings[cand_idxs]
+        n = len(cand_idxs)
+        # Gather candidates from the half precision copy to halve the bytes touched,
+        # then upcast into one contiguous buffer since NumPy has no fp16 BLAS gemm
+        item_vecs = np.ascontiguousarray(self.embeddings_fp16[cand_idxs], dtype=np.float32)
         # precompute similarity between candidates
         sim_to_query = cand_scores  # already IP from faiss
         sim_items = item_vecs @ item_vecs.T
-        while len(selected) < min(top_k, len(cand_idxs)):
+        # running max similarity of each candidate to anything already selected,
+        # updated with one column per pick instead of rescanning all selections
+        running = np.full(n, -np.inf, dtype=np.float32)
+        while len(selected) < min(top_k, n):
             if not selected:
                 j = int(np.argmax(sim_to_query))
             else:
-                sel_mask = np.zeros(len(cand_idxs), dtype=bool)
-                sel_mask[selected] = True  # indices into candidate list
-                # compute penalty = max similarity to any selected item
-                penalty = sim_items[:, sel_mask].max(axis=1) if sel_mask.any() else np.zeros(len(cand_idxs))
-                mmr_score = diversity * sim_to_query - (1 - diversity) * penalty
+                mmr_score = diversity * sim_to_query - (1 - diversity) * running
                 mmr_score[selected] = -1e9
                 j = int(np.argmax(mmr_score))
             selected.append(j)
+            running = np.maximum(running, sim_items[:, j])
         return [int(cand_idxs[j]) for j in selected]
 
     def _search(self, query_emb: np.ndarray, top_k: int = 8, filters: Optional[FilterSpec] = None) -> List[Tuple[int, float]]:
         fetch_k = max(top_k * 5, 20)
-        cand_scores, cand_idxs = self._raw_search(query_emb, fetch_k)
-        # remove invalid ids ( 1) and de duplicate while preserving order
-        if isinstance(cand_idxs, np.ndarray):
+        sub_idx = None
+        if filters and any([
+            filters.brand,
+            filters.category,
+            filters.price_min is not None,
+            filters.price_max is not None,
+            filters.tags_contains,
+        ]):
+            sub_idx = np.flatnonzero(self.filter_mask(filters))
+            if not 0 < len(sub_idx) <= max(EXACT_SUBSET_MAX_ROWS, top_k * 10):
+                sub_idx = None
+        if sub_idx is not None:
+            # Selective filters: score the few matching rows exactly instead of walking
+            # the global index; MMR and boosts below still apply to these candidates
+            sub_scores = (self.embeddings[sub_idx] @ query_emb).astype(np.float32, copy=False)
+            if len(sub_idx) > fetch_k:
+                top = np.argpartition(-sub_scores, fetch_k - 1)[:fetch_k]
+                sub_idx, sub_scores = sub_idx[top], sub_scores[top]
+            order = np.argsort(-sub_scores, kind="stable")
+            cand_idxs = sub_idx[order].astype(np.int64, copy=False)
+            cand_scores = sub_scores[order]
+        else:
+            cand_scores, cand_idxs = self._raw_search(query_emb, fetch_k)
+            # remove invalid ids (-1) and de duplicate while preserving order
             mask = cand_idxs != -1
-            cand_idxs = cand_idxs[mask]
-            cand_scores = cand_scores[mask]
-        seen = set()
-        uniq_idxs: List[int] = []
-        uniq_scores: List[float] = []
-        for i, s in zip(cand_idxs.tolist(), cand_scores.tolist()):
-            ii = int(i)
-            if ii in seen:
-                continue
-            seen.add(ii)
-            uniq_idxs.append(ii)
-            uniq_scores.append(float(s))
-        if not uniq_idxs:
-            return []
-        cand_idxs = np.array(uniq_idxs, dtype=np.int64)
-        cand_scores = np.array(uniq_scores, dtype=np.float32)
+            cand_idxs = cand_idxs[mask].astype(np.int64, copy=False)
+            cand_scores = cand_scores[mask].astype(np.float32, copy=False)
+            if cand_idxs.size == 0:
+                return []
+            _, first = np.unique(cand_idxs, return_index=True)
+            keep = np.sort(first)
+            cand_idxs = cand_idxs[keep]
+            cand_scores = cand_scores[keep]
 
         pick_idxs = self._mmr(query_emb, cand_idxs, cand_scores, top_k=top_k)
 
-        # Build list with simple boosts for structured matches
-        out: List[Tuple[int, float]] = []
-        for idx in pick_idxs:
-            score = float((query_emb @ self.embeddings[idx]).item())
-            row = self.df.iloc[idx]
-            if filters:
-                if filters.brand and str(row["brand"]).lower() == filters.brand.lower():
-                    score += 0.05
-                if filters.category and filters.category.lower() in str(row["category"]).lower():
-                    score += 0.03
-                if filters.tags_contains and filters.tags_contains.lower() in str(row["tags"]).lower():
-                    score += 0.02
-                # soft budget preference: slightly favor items near but below the max
-                if filters.price_max is not None:
-                    try:
-                        p = float(row["price"]) ; mx = float(filters.price_max)
-                        if p <= mx:
-                            score += 0.03 * (p / max(mx, 1e-6))
-                    except Exception:
-                        pass
-            out.append((idx, score))
-        # sort by adjusted score desc
-        out.sort(key=lambda x: x[1], reverse=True)
-        return out[:top_k]
+        # Score all picks at once: one gemv for similarity plus column wise boosts
+        # for structured matches against the precomputed lowercased arrays
+        picks = np.asarray(pick_idxs, dtype=np.int64)
+        scores = (self.embeddings[picks] @ query_emb).astype(np.float64)
+        if filters:
+            if filters.brand:
+                scores += np.where(self._brand_lc[picks] == filters.brand.lower(), 0.05, 0.0)
+            if filters.category:
+                scores += np.where(np.char.find(self._category_lc[picks], filters.category.lower()) >= 0, 0.03, 0.0)
+            if filters.tags_contains:
+                scores += np.where(np.char.find(self._tags_lc[picks], filters.tags_contains.lower()) >= 0, 0.02, 0.0)
+            # soft budget preference: slightly favor items near but below the max
+            if filters.price_max is not None:
+                p = self._price[picks]
+                mx = float(filters.price_max)
+                scores += np.where(p <= mx, 0.03 * (p / max(mx, 1e-6)), 0.0)
+        # sort by adjusted score desc (stable, so ties keep MMR order)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return list(zip(picks[order].tolist(), scores[order].tolist()))
+
+    def _encode_query_text_uncached(self, text: str) -> bytes:
+        # Bytes keep cached entries immutable so callers cannot mutate a shared vector
+        return self.encoder.encode_text([text])[0].tobytes()
+
+    def embed_text(self, text: str) -> np.ndarray:
+        # Query embedding through the LRU; returned vectors are read only
+        key = " ".join((text or "").lower().split())
+        return np.frombuffer(self._encode_query_text(key), dtype=np.float32)
 
     def search_by_text(self, text: str, top_k: int = 8, filters: Optional[FilterSpec] = None) -> List[Tuple[int, float]]:
-        q = self.encoder.encode_text([text])[0]
+        q = self.embed_text(text)
         return self._search(q, top_k=top_k, filters=filters)
 
     def search_by_image(self, image: Image.Image, top_k: int = 8, filters: Optional[FilterSpec] = None) -> List[Tuple[int, float]]:
         q = self.encoder.encode_image(image)
         return self._search(q, top_k=top_k, filters=filters)
 
-    def search_image_and_text(self, image: Image.Image, text: str, top_k: int = 8, filters: Optional[FilterSpec] = None, alpha: float = 0.6) -> List[Tuple[int, float]]:
+    def search_by_image_emb(self, image_emb: np.ndarray, top_k: int = 8, filters: Optional[FilterSpec] = None) -> List[Tuple[int, float]]:
+        # Same as search_by_image for callers that already hold the CLIP image vector
+        return self._search(image_emb, top_k=top_k, filters=filters)
+
+    def search_image_and_text(self, image: Optional[Image.Image], text: str, top_k: int = 8, filters: Optional[FilterSpec] = None, alpha: float = 0.6, image_emb: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
         # Combine image and text by linear interpolation of similarities on a shared index
-        q_img = self.encoder.encode_image(image)
-        q_txt = self.encoder.encode_text([text])[0]
-        q = alpha * q_img + (1 - alpha) * q_txt
-        # normalize to unit length for inner product stability
-        q = q / (np.linalg.norm(q) + 1e-12)
-        return self._search(q.astype('float32'), top_k=top_k, filters=filters)
+        q_img = image_emb if image_emb is not None else self.encoder.encode_image(image)
+        q_txt = self.embed_text(text)
+        q = (alpha * q_img + (1 - alpha) * q_txt).astype('float32', copy=False).reshape(1, -1)
+        # normalize to unit length for inner product stability (in place)
+        faiss.normalize_L2(q)
+        return self._search(q[0], top_k=top_k, filters=filters)
 
     def search_similar_to_id(self, pid: str, top_k: int = 8) -> List[Tuple[int, float]]:
-        row = self.df[self.df['id'].astype(str) == str(pid)]
-        if row.empty:
+        base_idx = self.id_to_row.get(str(pid))
+        if base_idx is None:
             return []
-        base_idx = int(row.index[0])
         q = self.embeddings[base_idx]
         scored = self._search(q, top_k=top_k + 1)
         # filter out the same item
-        out = [(i, s) for i, s in scored if self.df.iloc[i]['id'] != pid]
+        out = [(i, s) for i, s in scored if self._ids[i] != pid]
         return out[:top_k]
 
     def generate_copy(self, user_text: str, products: List[Product], filters: FilterSpec) -> str:
@@ -2,24 +2,42 @@
 # This is the main API server that handles chat requests, image search, and product lookups
 import os
 import io
+import asyncio
+import atexit
+import json
 import base64
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any
 from fastapi import FastAPI, File, UploadFile, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from PIL import Image
+import numpy as np
 import pandas as pd
 
 from agent.models import Product, ChatRequest, ChatResponse, FilterSpec, ProductsResponse
-from agent.router import classify_intent, extract_filters_llm_or_rules, smalltalk_reply
-from agent.tools import CatalogIndex, apply_filters
+from agent.router import TextCtx, classify_intent, extract_filters_llm_or_rules, smalltalk_reply
+from agent.tools import CatalogIndex
 from agent.embeddings import CLIPEncoder
 
 # app
 
+# orjson serializes responses several times faster than the stdlib encoder.
+# Newer FastAPI already writes response models straight to JSON bytes through
+# pydantic and deprecates ORJSONResponse, so only opt in where it still helps
+from fastapi.responses import JSONResponse
+try:  # pragma: no cover
+    import orjson  # type: ignore  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    DefaultResponse = JSONResponse if getattr(ORJSONResponse, "__deprecated__", None) else ORJSONResponse
+except Exception:  # pragma: no cover
+    DefaultResponse = JSONResponse
+
 APP_VERSION = "1.1.0"
-app = FastAPI(title="AI Commerce Agent API", version=APP_VERSION)
+app = FastAPI(title="AI Commerce Agent API", version=APP_VERSION, default_response_class=DefaultResponse)
 
 # Include evaluation API endpoints
 try:
@@ -47,6 +65,13 @@ CATALOG_PATH = os.environ.get("CATALOG_PATH", "data/catalog.csv")
 INDEX: CatalogIndex | None = None  # Product catalog with embeddings
 _ENCODER: CLIPEncoder | None = None  # CLIP model for image/text encoding  
 _CATEGORY_TEXT_EMB = None  # Cached embeddings for category inference
+_META_CACHE: Dict[str, Any] | None = None  # /meta payload, built once per catalog load
+_SHM_OWNER_PID: int | None = None  # process that created the shared embedding block
+# Recent upload embeddings keyed by image bytes hash, so multi turn refinement
+# of the same photo skips the CLIP vision tower
+_IMG_EMB_CACHE: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_IMG_EMB_CACHE_MAX = 64
+_IMG_EMB_LOCK = threading.Lock()
 _CATEGORY_LABELS = [
     "t-shirt",
     "hoodie",
@@ -72,36 +97,173 @@ def _get_encoder() -> CLIPEncoder:
             _ENCODER = CLIPEncoder()
     return _ENCODER
 
-def _infer_category_from_image(image: Image.Image) -> str | None:
-    """Guess the product category from an uploaded image using CLIP"""
-    global _CATEGORY_TEXT_EMB
-    enc = _get_encoder()
+def _load_category_text_emb(enc: CLIPEncoder) -> np.ndarray:
+    """Category prompt embeddings, cached on disk next to the catalog
+
+    The cache file is keyed by the labels, model and text backend/precision so
+    edits or an ONNX/half precision switch invalidate it
+    """
+    model_name = getattr(enc, "model_name", "clip-ViT-B-32")
+    variant = getattr(enc, "text_variant", "torch-fp32")
+    key = hashlib.sha1(json.dumps([model_name, variant, _CATEGORY_LABELS]).encode()).hexdigest()[:12]
+    path = os.path.join(os.path.dirname(CATALOG_PATH), f"category_text_emb_{key}.npy")
+    try:
+        if os.path.isfile(path):
+            emb = np.load(path)
+            if emb.shape[0] == len(_CATEGORY_LABELS):
+                return emb.astype(np.float16, copy=False)
+    except Exception:
+        pass
+    # One batched encode for every prompt, stored unit norm in half precision;
+    # cosine scores over 9 rows barely move in fp16
+    prompts = [f"a photo of a {c}" for c in _CATEGORY_LABELS]
+    emb = enc.encode_text(prompts)
+    emb = (emb / (np.linalg.norm(emb, axis=1, keepdims=True) + 1e-12)).astype(np.float16)
+    try:
+        np.save(path, emb)
+    except Exception:
+        pass
+    return emb
+
+def _image_embedding(img_bytes: bytes, image: Image.Image) -> np.ndarray:
+    key = hashlib.blake2b(img_bytes, digest_size=16).digest()
+    with _IMG_EMB_LOCK:
+        emb = _IMG_EMB_CACHE.get(key)
+        if emb is not None:
+            _IMG_EMB_CACHE.move_to_end(key)
+            return emb
+    emb = _get_encoder().encode_image(image)
+    emb.setflags(write=False)  # shared between requests
+    with _IMG_EMB_LOCK:
+        _IMG_EMB_CACHE[key] = emb
+        while len(_IMG_EMB_CACHE) > _IMG_EMB_CACHE_MAX:
+            _IMG_EMB_CACHE.popitem(last=False)
+    return emb
+
+_MAX_IMAGE_BYTES = 4 * 1024 * 1024
+_MAX_IMAGE_B64 = (_MAX_IMAGE_BYTES + 2) // 3 * 4  # base64 length of the largest allowed image
+
+def _open_image(img_bytes: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(img_bytes))
+    # Let the JPEG decoder downscale while decoding; CLIP only needs 224px anyway
+    image.draft("RGB", (512, 512))
+    return image.convert("RGB")
+
+def _decode_and_embed(image_base64: str) -> tuple[Image.Image, np.ndarray]:
+    # Blocking decode plus CLIP forward; handlers go through _decode_image
+    # Strip a data URL prefix without splitting and reject oversized payloads before decoding
+    c = image_base64.find(",")
+    payload = image_base64[c + 1:] if c >= 0 else image_base64
+    if len(payload) > _MAX_IMAGE_B64:
+        raise HTTPException(status_code=400, detail="Image too large (max 4MB)")
+    try:
+        img_bytes = base64.b64decode(payload)
+        if len(img_bytes) > _MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=400, detail="Image too large (max 4MB)")
+        image = _open_image(img_bytes)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
+    return image, _image_embedding(img_bytes, image)
+
+async def _decode_image(image_base64: str) -> tuple[Image.Image, np.ndarray]:
+    """Decode an uploaded base64 image and embed it off the event loop
+
+    Returns the RGB image and its (cached) CLIP embedding
+    """
+    return await asyncio.to_thread(_decode_and_embed, image_base64)
+
+def _post_prune(idxs: List[int], filters: FilterSpec, allowed: np.ndarray | None, trace: Dict[str, Any]) -> List[int]:
+    # Final safety: drop rows that violate the filters. allowed is the boolean row
+    # mask for the same filters when the caller already has it
+    if not any([
+        filters.brand,
+        filters.category,
+        filters.price_min is not None,
+        filters.price_max is not None,
+        filters.tags_contains,
+    ]):
+        return idxs
+    if allowed is None:
+        allowed = INDEX.filter_mask(filters)
+    kept = [i for i in idxs if allowed[i]]
+    pruned = len(idxs) - len(kept)
+    if pruned > 0:
+        trace["post_filter_pruned"] = pruned
+    return kept
+
+def _infer_category_from_image(img_emb: np.ndarray) -> str | None:
+    """Guess the product category from an uploaded image's CLIP embedding"""
+    if _CATEGORY_TEXT_EMB is None:
+        return None
     try:
-        img_emb = enc.encode_image(image)
-        if _CATEGORY_TEXT_EMB is None:
-            prompts = [f"a photo of a {c}" for c in _CATEGORY_LABELS]
-            _CATEGORY_TEXT_EMB = enc.encode_text(prompts)
+        img_emb = img_emb / (np.linalg.norm(img_emb) + 1e-12)
         sims = (img_emb @ _CATEGORY_TEXT_EMB.T).reshape(-1)
-        import numpy as np
-        idx = int(np.argmax(sims))
+        # One pass for best and runner up; a plain loop beats NumPy on 9 labels
+        idx, top, second = -1, float("-inf"), float("-inf")
+        for i, v in enumerate(sims.tolist()):
+            if v > top:
+                idx, top, second = i, v, top
+            elif v > second:
+                second = v
         # Confidence heuristic: require margin over second best
-        if len(sims) > 1:
-            top = float(sims[idx])
-            second = float(np.partition(sims, -2)[-2])
-            if top - second < 0.02:  # low margin → uncertain
-                return None
+        if len(sims) > 1 and top - second < 0.02:  # low margin → uncertain
+            return None
         return _CATEGORY_LABELS[idx]
     except Exception:
         return None
 
-@app.on_event("startup")
-def startup():
-    # Load the product catalog when the server starts
-    global INDEX
+def preload(warm_prompts: bool = True):
+    """Build the catalog index and warm caches in the current process
+
+    Only for setups where workers start fresh (spawn) or fork from a master that
+    has not served yet (gunicorn --preload, or PRELOAD_INDEX=1 at import). The
+    CLIP weights and FAISS index are then loaded once and mapped copy on write by
+    every worker. torch and FAISS thread pools do not survive fork, so before a
+    fork keep the embedding cache warm (no corpus encode in the master) and pass
+    warm_prompts=False to leave the category prompt encode to each worker.
+    SHARE_EMBEDDINGS=1 also moves the embedding matrix into named shared memory,
+    unlinked by the creating process on shutdown
+    """
+    global INDEX, _CATEGORY_TEXT_EMB, _SHM_OWNER_PID
     try:
-        INDEX = CatalogIndex(CATALOG_PATH)
+        INDEX = CatalogIndex(CATALOG_PATH, shared=os.environ.get("SHARE_EMBEDDINGS") == "1")
     except Exception as e:
         raise RuntimeError(f"Failed to initialize catalog index: {e}")
+    if INDEX.shm_name is not None:
+        # Forked workers inherit this; only the creator may unlink the block
+        _SHM_OWNER_PID = os.getpid()
+        atexit.register(_release_shared)
+    _refresh_meta()
+    if warm_prompts:
+        _warm_category_prompts()
+
+def _warm_category_prompts():
+    # Warm the category prompts before traffic so no request pays for a text encode
+    global _CATEGORY_TEXT_EMB
+    try:
+        _CATEGORY_TEXT_EMB = _load_category_text_emb(_get_encoder())
+    except Exception as e:
+        print(f"Warning: Could not prepare category embeddings: {e}")
+
+def _release_shared():
+    # Unlink the shared embedding block in the process that created it; a
+    # gunicorn master never runs the ASGI shutdown event, hence the atexit hook
+    if INDEX is None:
+        return
+    INDEX.close_shared(unlink=os.getpid() == _SHM_OWNER_PID)
+
+@app.on_event("startup")
+def startup():
+    # Load the product catalog when the server starts, unless a parent process
+    # already preloaded it before forking this worker
+    if INDEX is None:
+        preload()
+    elif _CATEGORY_TEXT_EMB is None:
+        _warm_category_prompts()
+
+@app.on_event("shutdown")
+def shutdown():
+    _release_shared()
 
 @app.get("/health")
 def health():
@@ -111,6 +273,11 @@ def health():
 def version():
     return {"version": APP_VERSION}
 
+def _products_at(idxs: List[int]) -> List[Product]:
+    # One positional slice for all rows; catalog data is trusted so skip validation
+    rows = INDEX.df.iloc[idxs].to_dict("records")
+    return [Product.model_construct(**r) for r in rows]
+
 def _user_context(messages: List[dict]) -> str:
     # Take the last contiguous block of user messages to preserve immediate intent
     block: List[str] = []
@@ -124,12 +291,14 @@ def _user_context(messages: List[dict]) -> str:
     return "\n".join(reversed(block)).strip()
 
 @app.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     # Main chat endpoint that handles text, images, and product recommendations
     if INDEX is None:
         raise HTTPException(status_code=500, detail="Index not ready")
 
     last_user_text = _user_context(req.messages)
+    # Lowercase and tokenize once for intent, filters, small talk and the keyword fallback
+    text_ctx = TextCtx.from_text(last_user_text)
     # Clamp and sanitize top_k for consistency and DoS protection
     try:
         requested_k = int(getattr(req, 'top_k', 8))
@@ -137,14 +306,14 @@ def chat(req: ChatRequest):
         requested_k = 8
     top_k = max(2, min(requested_k, 24))
 
-    intent = classify_intent(last_user_text, has_image=bool(req.image_base64))
+    intent = classify_intent(text_ctx, has_image=bool(req.image_base64))
 
     # Track what we did for debugging
     trace: Dict[str, Any] = {"intent": intent, "used_tools": [], "filters": {}}
     products: List[Product] = []
 
     # Merge UI provided filters (if any) with extracted filters. UI wins when provided.
-    extracted = extract_filters_llm_or_rules(last_user_text)
+    extracted = extract_filters_llm_or_rules(text_ctx)
     ui = req.filters or FilterSpec()
     def pick(a, b):
         return a if a not in (None, "", []) else b
@@ -185,60 +354,61 @@ def chat(req: ChatRequest):
         # Deterministic mode: catalog.csv already contains image_url and product_url
         return products
 
-    def _pick_with_filters(scored_list: List[tuple], filters: FilterSpec, top_k: int) -> List[int]:
+    def _pick_with_filters(scored_list: List[tuple], filters: FilterSpec, top_k: int) -> tuple[List[int], np.ndarray, bool]:
+        # Returns (chosen rows, row mask allowed by the strict filters, whether any pick came
+        # from a relaxed stage); only relaxed picks can violate the strict filters
         cand_idxs = [i for i, _ in scored_list]
-        df = INDEX.df
-
-        def norm(s: str) -> str:
-            return ''.join(ch for ch in s.lower() if ch.isalnum() or ch.isspace()).strip()
+        # Column arrays cached on the index; no per candidate pandas rows
+        keys = INDEX._dedup_keys
+        prices = INDEX._price
+        brands_lc = INDEX._brand_lc
 
         def add_unique(seed: List[int], pool: List[int]) -> List[int]:
-            seen_keys = { (norm(str(df.iloc[i]["title"])), norm(str(df.iloc[i]["brand"])) ) for i in seed }
+            seen_keys = {keys[i] for i in seed}
             out = list(seed)
             for i in pool:
                 if len(out) >= top_k:
                     break
-                key = (norm(str(df.iloc[i]["title"])), norm(str(df.iloc[i]["brand"])) )
+                key = keys[i]
                 if key in seen_keys:
                     continue
                 out.append(i)
                 seen_keys.add(key)
             return out
 
+        brand_lc = str(filters.brand).lower() if filters.brand else None
+
         def within_price_brand(i: int) -> bool:
-            row = df.iloc[i]
             # Always enforce price bounds
-            try:
-                price = float(row.get("price", 0.0))
-            except Exception:
-                price = 0.0
+            price = prices[i]
             if filters.price_min is not None and price < float(filters.price_min):
                 return False
             if filters.price_max is not None and price > float(filters.price_max):
                 return False
             # Always enforce brand when specified
-            if filters.brand and str(row.get("brand","")) .lower() != str(filters.brand).lower():
+            if brand_lc and brands_lc[i] != brand_lc:
                 return False
             return True
 
         # Stage 1: strict filter
-        allowed = apply_filters(df, filters)
-        allowed_ids = set(allowed["id"].astype(str))
-        primary_all = [i for i in cand_idxs if df.iloc[i]["id"] in allowed_ids]
+        allowed = INDEX.filter_mask(filters)
+        primary_all = [i for i in cand_idxs if allowed[i]]
         chosen: List[int] = add_unique([], primary_all)
         trace["filled_relaxed"] = len(chosen) < top_k
+        relaxed = False
 
         # Stage 2: relax within the same category to keep results coherent
         if len(chosen) < top_k and filters.category:
             cat = str(filters.category).lower()
             cat_pool = [
                 i for i in cand_idxs
-                if i not in chosen and cat in str(df.iloc[i]["category"]).lower() and within_price_brand(i)
+                if i not in chosen and cat in INDEX._category_lc[i] and within_price_brand(i)
             ]
             before = len(chosen)
             chosen = add_unique(chosen, cat_pool)
             if len(chosen) > before:
                 trace["filled_category_relax"] = True
+                relaxed = True
 
         # Stage 3: fill with any strong semantic matches if still short
         # Important: if a category was explicitly requested, do NOT relax across categories.
@@ -248,6 +418,7 @@ def chat(req: ChatRequest):
             chosen = add_unique(chosen, fill_pool)
             if len(chosen) > before:
                 trace["filled_any_relax"] = True
+                relaxed = True
 
         # Ensure at least two unique suggestions if available
         min_unique = int(os.environ.get("MIN_UNIQUE_RESULTS", "2"))
@@ -255,187 +426,114 @@ def chat(req: ChatRequest):
             # take first two unique by title/brand from candidates
             chosen = add_unique([], cand_idxs)
             chosen = chosen[: max(min_unique, top_k) ]
+            relaxed = True
 
-        return chosen
+        return chosen, allowed, relaxed
 
-    def _keyword_fallback(user_text: str, filters: FilterSpec, top_k: int) -> List[int]:
+    def _keyword_fallback(ctx: TextCtx, filters: FilterSpec, top_k: int) -> List[int]:
         # Lightweight, deterministic scoring if vector search returns nothing
-        df = INDEX.df
-        cand = apply_filters(df, filters) if any([
-            filters.brand, filters.category, filters.price_min is not None,
-            filters.price_max is not None, filters.tags_contains
-        ]) else df
-
-        text = (user_text or "").lower()
-        tokens = [t for t in ''.join([c if c.isalnum() else ' ' for c in text]).split() if t]
-        token_set = set(tokens)
-
-        scores: List[tuple[int, float]] = []
-        for i, row in cand.reset_index().iterrows():
-            idx = int(row['index']) if 'index' in row else int(i)
-            title = str(row.get('title','')).lower()
-            desc = str(row.get('description','')).lower()
-            brand = str(row.get('brand','')).lower()
-            tags = str(row.get('tags','')).lower()
-            try:
-                price = float(row.get('price', 0.0))
-            except Exception:
-                price = 0.0
-            s = 0.0
-            # Brand signal
-            if brand and brand in text:
-                s += 5.0
+        # Enforces category and budget bounds strictly through the filter mask
+        mask = INDEX.filter_mask(filters)
+
+        text = ctx.lc
+        token_set = ctx.tokens
+
+        scores = np.zeros(len(mask), dtype=float)
+        # Brand signal
+        brands = INDEX._brand_lc
+        scores += np.where((np.char.str_len(brands) > 0) & (np.char.find(text, brands) >= 0), 5.0, 0.0)
+        for tok in token_set:
             # Tag matches
-            for tok in token_set:
-                if tok and tok in tags:
-                    s += 2.0
+            scores += np.where(np.char.find(INDEX._tags_lc, tok) >= 0, 2.0, 0.0)
             # Title/description keyword presence
-            for tok in token_set:
-                if tok and (tok in title or tok in desc):
-                    s += 1.0
-            # Enforce budget bounds strictly
-            if filters.price_min is not None and price < float(filters.price_min):
-                continue
-            if filters.price_max is not None and price > float(filters.price_max):
-                continue
-            # Slight preference to items closer to max (within budget)
-            if filters.price_max is not None:
-                mx = float(filters.price_max)
-                s += 1.5 * (price / max(mx, 1e-6))
-            # Category guard: never leave category if explicitly set
-            if filters.category:
-                cat = str(filters.category).lower()
-                if cat not in str(row.get('category','')).lower():
-                    continue
-            if s > 0:
-                scores.append((idx, s))
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return [i for i, _ in scores[:top_k]]
-
-    if intent == "IMAGE_AND_TEXT":
+            in_text = (np.char.find(INDEX._title_lc, tok) >= 0) | (np.char.find(INDEX._desc_lc, tok) >= 0)
+            scores += np.where(in_text, 1.0, 0.0)
+        # Slight preference to items closer to max (within budget)
+        if filters.price_max is not None:
+            mx = float(filters.price_max)
+            scores += 1.5 * (INDEX._price / max(mx, 1e-6))
+        hits = np.flatnonzero(mask & (scores > 0))
+        # Stable so ties keep catalog order
+        order = np.argsort(-scores[hits], kind="stable")[:top_k]
+        return hits[order].tolist()
+
+    if intent in ("IMAGE_AND_TEXT", "IMAGE_SEARCH"):
         if not req.image_base64:
             raise HTTPException(status_code=400, detail="image_base64 missing")
-        try:
-            img_bytes = base64.b64decode(req.image_base64.split(",")[-1])
-            if len(img_bytes) > 4 * 1024 * 1024:
-                raise HTTPException(status_code=400, detail="Image too large (max 4MB)")
-            image = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
-        # If user didn't provide a category, infer it from the image and enforce
-        inferred_cat = None
-        if not strict_filters.category:
-            inferred_cat = _infer_category_from_image(image)
-            if inferred_cat:
-                strict_filters.category = inferred_cat
-                trace["category_inferred"] = inferred_cat
-        trace["filters"] = final_filters.model_dump()
-        scored = INDEX.search_image_and_text(image, last_user_text, top_k=max(top_k * 10, 50), filters=strict_filters, alpha=0.6)
-        chosen = _pick_with_filters(scored, strict_filters, req.top_k)
-        products = [Product(**INDEX.df.iloc[i].to_dict()) for i in chosen]
-        # Final safety: prune anything that accidentally violated filters
-        if any([
-            final_filters.brand,
-            final_filters.category,
-            final_filters.price_min is not None,
-            final_filters.price_max is not None,
-            final_filters.tags_contains,
-        ]):
-            allowed = apply_filters(INDEX.df, final_filters)
-            allowed_ids = set(allowed["id"].astype(str))
-            pre_n = len(products)
-            products = [p for p in products if p.id in allowed_ids]
-            pruned = pre_n - len(products)
-            if pruned > 0:
-                trace["post_filter_pruned"] = pruned
-        products = _enrich(products)
-        reply = INDEX.generate_copy(last_user_text, products, final_filters)
-        trace["used_tools"].extend(["image_vector_search", "text_vector_search", "mmr", "fusion_alpha_0.6"])
-
-    elif intent == "IMAGE_SEARCH":
-        if not req.image_base64:
-            raise HTTPException(status_code=400, detail="image_base64 missing")
-        try:
-            img_bytes = base64.b64decode(req.image_base64.split(",")[-1])
-            if len(img_bytes) > 4 * 1024 * 1024:
-                raise HTTPException(status_code=400, detail="Image too large (max 4MB)")
-            image = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
+        image, img_emb = await _decode_image(req.image_base64)
         filters = strict_filters
-        trace["filters"] = filters.model_dump()
-        # If user didn't provide a category, infer it from the image and enforce
-        if not filters.category:
-            inferred_cat = _infer_category_from_image(image)
-            if inferred_cat:
-                filters.category = inferred_cat
-                trace["category_inferred"] = inferred_cat
-        scored = INDEX.search_by_image(image, top_k=max(top_k * 10, 50), filters=filters)
-        chosen = _pick_with_filters(scored, filters, req.top_k)
-        products = [Product(**INDEX.df.iloc[i].to_dict()) for i in chosen]
-        if any([
-            filters.brand,
-            filters.category,
-            filters.price_min is not None,
-            filters.price_max is not None,
-            final_filters.tags_contains,
-        ]):
-            allowed = apply_filters(INDEX.df, filters)
-            allowed_ids = set(allowed["id"].astype(str))
-            pre_n = len(products)
-            products = [p for p in products if p.id in allowed_ids]
-            pruned = pre_n - len(products)
-            if pruned > 0:
-                trace["post_filter_pruned"] = pruned
-        products = _enrich(products)
-        reply = INDEX.generate_copy(last_user_text or "similar items", products, filters)
-        trace["used_tools"].extend(["image_vector_search", "mmr"])
+        trace["filters"] = (final_filters if intent == "IMAGE_AND_TEXT" else filters).model_dump()
+
+        def _image_turn() -> tuple[List[Product], str]:
+            # Inference, search, picking and copy all scan catalog columns; run them
+            # in one worker hop so the event loop stays free
+            # If user didn't provide a category, infer it from the image and enforce
+            if not filters.category:
+                inferred_cat = _infer_category_from_image(img_emb)
+                if inferred_cat:
+                    filters.category = inferred_cat
+                    trace["category_inferred"] = inferred_cat
+
+            if intent == "IMAGE_AND_TEXT":
+                scored = INDEX.search_image_and_text(
+                    image, last_user_text,
+                    top_k=max(top_k * 10, 50), filters=filters, alpha=0.6, image_emb=img_emb,
+                )
+                chosen, _, _ = _pick_with_filters(scored, filters, req.top_k)
+                # Always pruned against final_filters, which can be stricter than the pick filters
+                products = _products_at(_post_prune(chosen, final_filters, None, trace))
+                copy_text, copy_filters = last_user_text, final_filters
+                trace["used_tools"].extend(["image_vector_search", "text_vector_search", "mmr", "fusion_alpha_0.6"])
+            else:
+                scored = INDEX.search_by_image_emb(img_emb, top_k=max(top_k * 10, 50), filters=filters)
+                chosen, allowed, relaxed = _pick_with_filters(scored, filters, req.top_k)
+                # Strict picks already satisfy the filters; only relaxed fills need a prune
+                if relaxed:
+                    chosen = _post_prune(chosen, filters, allowed, trace)
+                products = _products_at(chosen)
+                copy_text, copy_filters = last_user_text or "similar items", filters
+                trace["used_tools"].extend(["image_vector_search", "mmr"])
+            products = _enrich(products)
+            return products, INDEX.generate_copy(copy_text, products, copy_filters)
+
+        products, reply = await asyncio.to_thread(_image_turn)
 
     elif intent == "TEXT_RECOMMEND":
         filters: FilterSpec = strict_filters
         trace["filters"] = filters.model_dump()
-        scored = INDEX.search_by_text(last_user_text, top_k=max(top_k * 10, 100), filters=filters)
-        chosen = _pick_with_filters(scored, filters, req.top_k)
-        products = [Product(**INDEX.df.iloc[i].to_dict()) for i in chosen]
-        if not products:
-            # Fallback: simple keyword scoring within filters
-            fallback_idxs = _keyword_fallback(last_user_text, filters, req.top_k)
-            if fallback_idxs:
-                products = [Product(**INDEX.df.iloc[i].to_dict()) for i in fallback_idxs]
-                trace["fallback"] = "keyword"
-        if any([
-            filters.brand,
-            filters.category,
-            filters.price_min is not None,
-            filters.price_max is not None,
-            filters.tags_contains,
-        ]):
-            allowed = apply_filters(INDEX.df, filters)
-            allowed_ids = set(allowed["id"].astype(str))
-            pre_n = len(products)
-            products = [p for p in products if p.id in allowed_ids]
-            pruned = pre_n - len(products)
-            if pruned > 0:
-                trace["post_filter_pruned"] = pruned
-        products = _enrich(products)
-
-        # Generate a concise reply
-        reply = INDEX.generate_copy(last_user_text, products, filters)
 
+        def _text_turn() -> tuple[List[Product], str]:
+            # Search, picking and the keyword fallback all scan catalog columns; run
+            # them in one worker hop so the event loop stays free
+            scored = INDEX.search_by_text(last_user_text, top_k=max(top_k * 10, 100), filters=filters)
+            chosen, allowed, relaxed = _pick_with_filters(scored, filters, req.top_k)
+            if not chosen:
+                # Fallback: simple keyword scoring within filters
+                fallback_idxs = _keyword_fallback(text_ctx, filters, req.top_k)
+                if fallback_idxs:
+                    chosen = fallback_idxs
+                    trace["fallback"] = "keyword"
+            # Strict picks and keyword fallback hits already satisfy the filters
+            elif relaxed:
+                chosen = _post_prune(chosen, filters, allowed, trace)
+            products = _products_at(chosen)
+            products = _enrich(products)
+
+            # Generate a concise reply
+            return products, INDEX.generate_copy(last_user_text, products, filters)
+
+        products, reply = await asyncio.to_thread(_text_turn)
         trace["used_tools"].extend(["text_vector_search", "mmr"])
 
     else:  # SMALLTALK
-        reply = smalltalk_reply(last_user_text)
+        reply = smalltalk_reply(text_ctx)
         products = []
 
-    # De duplicate products by id while preserving order
-    _seen = set(); _unique: List[Product] = []
+    # De duplicate products by id while preserving order; the first product for an id wins
+    by_id: Dict[str, Product] = {}
     for p in products:
-        if p.id in _seen:
-            continue
-        _seen.add(p.id)
-        _unique.append(p)
-    products = _unique
+        by_id.setdefault(p.id, p)
+    products = list(by_id.values())
 
     trace["requested_top_k"] = requested_k
     trace["returned"] = len(products)
@@ -447,15 +545,16 @@ async def image_search(file: UploadFile = File(...), top_k: int = 8):
         raise HTTPException(status_code=500, detail="Index not ready")
     try:
         content = await file.read()
-        if len(content) > 4 * 1024 * 1024:
+        if len(content) > _MAX_IMAGE_BYTES:
             raise HTTPException(status_code=400, detail="Image too large (max 4MB)")
-        image = Image.open(io.BytesIO(content)).convert("RGB")
+        image = await asyncio.to_thread(_open_image, content)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
 
     top_k = max(2, min(int(top_k), 24))
-    scored = INDEX.search_by_image(image, top_k=top_k)
-    products = [Product(**INDEX.df.iloc[i].to_dict()) for i, _ in scored]
+    img_emb = await asyncio.to_thread(_image_embedding, content, image)
+    scored = await asyncio.to_thread(INDEX.search_by_image_emb, img_emb, top_k=top_k)
+    products = _products_at([i for i, _ in scored])
     reply = f"Here are {len(products)} close matches to your image."
     return ChatResponse(reply=reply, products=products, trace={"intent": "IMAGE_SEARCH", "used_tools": ["image_vector_search"]})
 
@@ -463,26 +562,37 @@ async def image_search(file: UploadFile = File(...), top_k: int = 8):
 def get_product(pid: str):
     if INDEX is None:
         raise HTTPException(status_code=500, detail="Index not ready")
-    row = INDEX.df.loc[INDEX.df["id"] == pid]
-    if row.empty:
+    i = INDEX.id_to_row.get(pid)
+    if i is None:
         raise HTTPException(status_code=404, detail="Not found")
-    return Product(**row.iloc[0].to_dict())
+    return _products_at([i])[0]
 
-@app.get("/meta")
-def meta():
-    if INDEX is None:
-        raise HTTPException(status_code=500, detail="Index not ready")
+def _refresh_meta() -> None:
+    """Recompute the cached /meta payload; call again after swapping the catalog"""
+    global _META_CACHE
     df = INDEX.df
     brands = sorted([b for b in df["brand"].dropna().unique().tolist()])
     categories = sorted([c for c in df["category"].dropna().unique().tolist()])
     price_min = float(df["price"].min()) if not df.empty else 0.0
     price_max = float(df["price"].max()) if not df.empty else 0.0
-    return {"brands": brands, "categories": categories, "price_min": price_min, "price_max": price_max}
+    _META_CACHE = {"brands": brands, "categories": categories, "price_min": price_min, "price_max": price_max}
+
+@app.get("/meta")
+def meta():
+    if INDEX is None:
+        raise HTTPException(status_code=500, detail="Index not ready")
+    if _META_CACHE is None:
+        _refresh_meta()
+    return _META_CACHE
 
 @app.get("/similar/{pid}", response_model=ProductsResponse)
 def similar(pid: str, top_k: int = 6):
     if INDEX is None:
         raise HTTPException(status_code=500, detail="Index not ready")
     scored = INDEX.search_similar_to_id(pid, top_k=top_k)
-    products = [Product(**INDEX.df.iloc[i].to_dict()) for i, _ in scored]
+    products = _products_at([i for i, _ in scored])
     return {"products": products}
+
+if os.environ.get("PRELOAD_INDEX") == "1":
+    # Likely a master about to fork workers; no torch forward here
+    preload(warm_prompts=False)
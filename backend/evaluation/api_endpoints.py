@@ -1,18 +1,42 @@
 """Eval API endpoints"""
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import json
+import os
 from pathlib import Path
 from datetime import datetime
 import uuid
 
+try:  # pragma: no cover
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 from evaluation.evaluate_hybrid import HybridSystemEvaluator
 from evaluation.report_generator import ReportGenerator
 
 router = APIRouter()
 
-_running_evals: Dict[str, Dict[str, Any]] = {}
+_running_evals: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# Evaluations load their own CLIP model, so run one at a time behind a small queue
+_eval_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eval")
+_MAX_ACTIVE_EVALS = 4
+# Oldest finished jobs are forgotten past this many tracked entries
+_MAX_TRACKED_EVALS = 100
+
+
+def _evict_finished_jobs():
+    """Drop the oldest finished jobs once the job table is over capacity"""
+    excess = len(_running_evals) - _MAX_TRACKED_EVALS
+    if excess <= 0:
+        return
+    for job_id in [k for k, v in _running_evals.items() if v["status"] in ("completed", "failed")][:excess]:
+        del _running_evals[job_id]
 
 
 class EvaluationRequest(BaseModel):
@@ -30,16 +54,62 @@ class EvaluationStatus(BaseModel):
     error: Optional[str] = None
 
 
+# Evaluators hold the catalog index and CLIP model; reuse one while its inputs are unchanged
+_EVALUATOR_CACHE: Dict[tuple, HybridSystemEvaluator] = {}
+
+
+def _get_evaluator(catalog_path: str, golden_queries_path: str) -> HybridSystemEvaluator:
+    key = (catalog_path, golden_queries_path,
+           os.path.getmtime(catalog_path), os.path.getmtime(golden_queries_path))
+    evaluator = _EVALUATOR_CACHE.get(key)
+    if evaluator is None:
+        _EVALUATOR_CACHE.clear()  # keep only the newest one in memory
+        evaluator = HybridSystemEvaluator(
+            catalog_path=catalog_path,
+            golden_queries_path=golden_queries_path
+        )
+        _EVALUATOR_CACHE[key] = evaluator
+    # A reused evaluator starts each job with a cold search cache
+    evaluator._cached_search.cache_clear()
+    evaluator.results = {}
+    evaluator.start_time = None
+    evaluator.end_time = None
+    return evaluator
+
+
+@functools.lru_cache(maxsize=4)
+def _read_text_cached(path: str, mtime: float) -> str:
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def _load_json(path) -> Any:
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_json_cached(path: str, mtime: float) -> Any:
+    # Callers only read the parsed results, so the cached object is shared
+    return _load_json(path)
+
+
+def _read_latest(path: Path, as_json: bool = True) -> Any:
+    """Read a results file, re parsing only when its mtime changes"""
+    mtime = path.stat().st_mtime
+    return _read_json_cached(str(path), mtime) if as_json else _read_text_cached(str(path), mtime)
+
+
 def run_evaluation_task(job_id: str, mode: str, catalog_path: str, golden_queries_path: str):
     """Run eval in background"""
     try:
         _running_evals[job_id]["status"] = "running"
         _running_evals[job_id]["started_at"] = datetime.now().isoformat()
 
-        evaluator = HybridSystemEvaluator(
-            catalog_path=catalog_path,
-            golden_queries_path=golden_queries_path
-        )
+        evaluator = _get_evaluator(catalog_path, golden_queries_path)
 
         if mode == "all":
             results = evaluator.run_all_evaluations()
@@ -102,12 +172,17 @@ def run_evaluation_task(job_id: str, mode: str, catalog_path: str, golden_querie
 
 
 @router.post("/run", response_model=EvaluationStatus)
-async def start_evaluation(request: EvaluationRequest, background_tasks: BackgroundTasks):
+async def start_evaluation(request: EvaluationRequest):
     """
     Start an evaluation job in the background.
 
+    Jobs run one at a time; returns 429 when too many are already queued.
     Returns job_id to track progress.
     """
+    active = sum(1 for v in _running_evals.values() if v["status"] in ("pending", "running"))
+    if active >= _MAX_ACTIVE_EVALS:
+        raise HTTPException(status_code=429, detail="Too many evaluations queued, try again later")
+
     job_id = str(uuid.uuid4())[:8]
 
     _running_evals[job_id] = {
@@ -119,8 +194,10 @@ async def start_evaluation(request: EvaluationRequest, background_tasks: Backgro
         "error": None
     }
 
-    # Start background task
-    background_tasks.add_task(
+    _evict_finished_jobs()
+
+    # Queue on the single eval worker
+    _eval_pool.submit(
         run_evaluation_task,
         job_id,
         request.mode,
@@ -148,10 +225,7 @@ async def get_latest_results():
     if not results_path.exists():
         raise HTTPException(status_code=404, detail="No evaluation results found. Run an evaluation first.")
 
-    with open(results_path, 'r') as f:
-        results = json.load(f)
-
-    return results
+    return _read_latest(results_path)
 
 
 @router.get("/results/{job_id}")
@@ -169,10 +243,7 @@ async def get_evaluation_results(job_id: str):
     if not results_path or not Path(results_path).exists():
         raise HTTPException(status_code=404, detail="Results file not found")
 
-    with open(results_path, 'r') as f:
-        results = json.load(f)
-
-    return results
+    return _load_json(results_path)
 
 
 @router.get("/jobs")
@@ -192,10 +263,7 @@ async def get_latest_report():
     if not report_path.exists():
         raise HTTPException(status_code=404, detail="No report found. Run an evaluation first.")
 
-    with open(report_path, 'r') as f:
-        html_content = f.read()
-
-    return {"html": html_content}
+    return {"html": _read_latest(report_path, as_json=False)}
 
 
 @router.get("/summary")
@@ -206,8 +274,7 @@ async def get_evaluation_summary():
     if not results_path.exists():
         raise HTTPException(status_code=404, detail="No evaluation results found")
 
-    with open(results_path, 'r') as f:
-        results = json.load(f)
+    results = _read_latest(results_path)
 
     # Extract key metrics for quick display
     summary = {
@@ -257,22 +324,21 @@ async def get_evaluation_history():
     evaluations = []
     for file_path in result_files[:10]:  # Last 10 evaluations
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                metadata = data.get("metadata", {})
-
-                # Extract key metric
-                ndcg = 0
-                if "retrieval" in data and "aggregated" in data["retrieval"]:
-                    ndcg = data["retrieval"]["aggregated"].get("ndcg@5", {}).get("mean", 0)
-
-                evaluations.append({
-                    "filename": file_path.name,
-                    "timestamp": metadata.get("start_time", ""),
-                    "duration_seconds": metadata.get("duration_seconds", 0),
-                    "catalog_size": metadata.get("catalog_size", 0),
-                    "ndcg@5": ndcg
-                })
+            data = _load_json(file_path)
+            metadata = data.get("metadata", {})
+
+            # Extract key metric
+            ndcg = 0
+            if "retrieval" in data and "aggregated" in data["retrieval"]:
+                ndcg = data["retrieval"]["aggregated"].get("ndcg@5", {}).get("mean", 0)
+
+            evaluations.append({
+                "filename": file_path.name,
+                "timestamp": metadata.get("start_time", ""),
+                "duration_seconds": metadata.get("duration_seconds", 0),
+                "catalog_size": metadata.get("catalog_size", 0),
+                "ndcg@5": ndcg
+            })
         except Exception:
             continue
 
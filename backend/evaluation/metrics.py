@@ -1,44 +1,95 @@
 """Standard IR metrics for eval"""
-from typing import List, Set, Dict, Any
+from typing import List, Set, Dict, Any, Tuple
 import numpy as np
-from collections import defaultdict
+import pandas as pd
+
+from evaluation.metrics_numba import HAVE_NUMBA, METRICS_PER_K, compute_metrics, encode_query
+
+# Rank discounts for NDCG, extended by _discounts if a bigger k shows up
+_MAX_K = 256
+_DISC = 1.0 / np.log2(np.arange(2, _MAX_K + 2, dtype=np.float64))
+
+
+def _as_set(relevant) -> Set[str]:
+    """relevant as a set/frozenset, so membership tests stay O(1)"""
+    if isinstance(relevant, (set, frozenset)):
+        return relevant
+    return frozenset(relevant)
+
+
+def _hits_cumsum(relevant: Set[str], retrieved: List[str], kmax: int) -> Tuple[np.ndarray, np.ndarray]:
+    """0/1 hit per position in retrieved[:kmax] and its running total
+
+    cum[k-1] is the number of relevant items in the top k, so every cutoff
+    comes from one membership pass.
+    """
+    top = retrieved[:max(kmax, 0)]
+    contains = _as_set(relevant).__contains__
+    hits = np.fromiter((1 if contains(item) else 0 for item in top),
+                       dtype=np.int32, count=len(top))
+    return hits, np.cumsum(hits)
+
+
+def _found_at(cum: np.ndarray, k: int, cast=int):
+    """Running total at cutoff k (relevant items in the top k for a _hits_cumsum total)"""
+    n = min(k, len(cum))
+    return cast(cum[n - 1]) if n > 0 else cast(0)
 
 
 def precision_at_k(relevant: Set[str], retrieved: List[str], k: int) -> float:
     """What fraction of top K results are relevant"""
     if k <= 0 or not retrieved:
         return 0.0
-    top_k = retrieved[:k]
-    relevant_in_top_k = sum(1 for item in top_k if item in relevant)
-    return relevant_in_top_k / k
+    _, cum = _hits_cumsum(relevant, retrieved, k)
+    return _found_at(cum, k) / k
 
 
 def recall_at_k(relevant: Set[str], retrieved: List[str], k: int) -> float:
     """What fraction of relevant items did we find in top K"""
     if not relevant or k <= 0:
         return 0.0
-    top_k = retrieved[:k]
-    relevant_in_top_k = sum(1 for item in top_k if item in relevant)
-    return relevant_in_top_k / len(relevant)
+    _, cum = _hits_cumsum(relevant, retrieved, k)
+    return _found_at(cum, k) / len(relevant)
+
+
+def _f1(prec: float, rec: float) -> float:
+    if prec + rec == 0:
+        return 0.0
+    return 2 * (prec * rec) / (prec + rec)
 
 
 def f1_at_k(relevant: Set[str], retrieved: List[str], k: int) -> float:
     """Harmonic mean of precision and recall"""
     prec = precision_at_k(relevant, retrieved, k)
     rec = recall_at_k(relevant, retrieved, k)
-    if prec + rec == 0:
-        return 0.0
-    return 2 * (prec * rec) / (prec + rec)
+    return _f1(prec, rec)
 
 
 def mean_reciprocal_rank(relevant: Set[str], retrieved: List[str]) -> float:
     """Reciprocal of rank of first relevant item"""
-    for rank, item in enumerate(retrieved, start=1):
-        if item in relevant:
-            return 1.0 / rank
+    contains = _as_set(relevant).__contains__
+    for i, item in enumerate(retrieved):
+        if contains(item):
+            return 1.0 / (i + 1)
     return 0.0
 
 
+def _mrr_from_hits(hits: np.ndarray) -> float:
+    """MRR from a _hits_cumsum hit vector that covers the whole retrieved list"""
+    if not len(hits):
+        return 0.0
+    first = int(np.argmax(hits))
+    return 1.0 / (first + 1) if hits[first] else 0.0
+
+
+def _discounts(n: int) -> np.ndarray:
+    """1/log2(rank+1) for ranks 1..n, grown on demand"""
+    global _DISC
+    if n > len(_DISC):
+        _DISC = 1.0 / np.log2(np.arange(2, n + 2, dtype=np.float64))
+    return _DISC[:n]
+
+
 def ndcg_at_k(relevant: Set[str], retrieved: List[str], k: int,
                relevance_scores: Dict[str, float] = None) -> float:
     """NDCG - accounts for position (higher = better)"""
@@ -48,21 +99,27 @@ def ndcg_at_k(relevant: Set[str], retrieved: List[str], k: int,
     top_k = retrieved[:k]
 
     # DCG - actual score
-    dcg = 0.0
-    for i, item in enumerate(top_k, start=1):
-        if item in relevant:
-            rel_score = relevance_scores.get(item, 1.0) if relevance_scores else 1.0
-            dcg += rel_score / np.log2(i + 1)
+    contains = _as_set(relevant).__contains__
+    if relevance_scores:
+        get = relevance_scores.get
+        gains = (get(item, 1.0) if contains(item) else 0.0 for item in top_k)
+    else:
+        gains = (1.0 if contains(item) else 0.0 for item in top_k)
+    scores = np.fromiter(gains, dtype=np.float64, count=len(top_k))
+    dcg = float(scores @ _discounts(len(top_k)))
 
     # IDCG - ideal score
     if relevance_scores:
-        ideal_scores = sorted([relevance_scores.get(item, 0) for item in relevant], reverse=True)
+        ideal = np.fromiter((relevance_scores.get(item, 0) for item in relevant),
+                            dtype=np.float64, count=len(relevant))
+        # Only the k best matter: partition them to the front, sort just those
+        k_eff = min(k, ideal.size)
+        if 0 < k_eff < ideal.size:
+            ideal = -np.partition(-ideal, k_eff - 1)[:k_eff]
+        ideal = np.sort(ideal)[::-1][:k_eff]
     else:
-        ideal_scores = [1.0] * len(relevant)
-
-    idcg = 0.0
-    for i, score in enumerate(ideal_scores[:k], start=1):
-        idcg += score / np.log2(i + 1)
+        ideal = np.ones(min(k, len(relevant)))
+    idcg = float(ideal @ _discounts(len(ideal)))
 
     return dcg / idcg if idcg > 0 else 0.0
 
@@ -74,9 +131,10 @@ def mean_average_precision(relevant: Set[str], retrieved: List[str]) -> float:
 
     precisions = []
     num_relevant_seen = 0
+    contains = _as_set(relevant).__contains__
 
     for i, item in enumerate(retrieved, start=1):
-        if item in relevant:
+        if contains(item):
             num_relevant_seen += 1
             precisions.append(num_relevant_seen / i)
 
@@ -85,96 +143,224 @@ def mean_average_precision(relevant: Set[str], retrieved: List[str]) -> float:
 
 def hit_rate_at_k(relevant: Set[str], retrieved: List[str], k: int) -> float:
     """Did we get at least one hit in top K"""
-    top_k = retrieved[:k]
-    return 1.0 if any(item in relevant for item in top_k) else 0.0
+    _, cum = _hits_cumsum(relevant, retrieved, k)
+    return 1.0 if _found_at(cum, k) > 0 else 0.0
+
+
+class CatalogSnapshot:
+    """Struct-of-arrays copy of the catalog columns the metrics read
+
+    Built once per eval so per-result lookups are a dict get plus array
+    indexing instead of a DataFrame filter. Columns hold lowercased values
+    per catalog row (blank when missing) with one extra blank slot at the
+    end, so row -1 from rows() reads as unknown.
+    """
+
+    def __init__(self, catalog_df, dims=("category", "brand")):
+        self.ids = catalog_df["id"].to_numpy()
+        n = len(self.ids)
+        # First row wins on duplicate ids
+        self.id_to_row = dict(zip(self.ids[::-1].tolist(), range(n - 1, -1, -1)))
+        self.columns = {}
+        for dim in dims:
+            values = catalog_df[dim].tolist() if dim in catalog_df.columns else [""] * n
+            self.columns[dim] = np.array([str(v).lower() if v else "" for v in values] + [""], dtype=str)
+        self.category = self.columns.get("category")
+        self.brand = self.columns.get("brand")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rows(self, ids: List[str]) -> np.ndarray:
+        """Catalog row per id as int32, -1 for ids not in the catalog"""
+        get = self.id_to_row.get
+        return np.fromiter((get(pid, -1) for pid in ids), dtype=np.int32, count=len(ids))
+
+    def relevant_mask(self, relevant) -> np.ndarray:
+        """Bool per catalog row (plus the blank slot), True where the id is relevant
+
+        mask[rows] is then the hit vector for a result list in one indexing
+        call. Every row carrying a relevant id is marked, including later
+        duplicates of an id; ids missing from the catalog are just left out.
+        """
+        mask = np.zeros(len(self.ids) + 1, dtype=np.bool_)
+        mask[:-1] = np.isin(self.ids, np.asarray(list(relevant), dtype=object))
+        return mask
+
+
+def _snapshot(catalog, dims=("category", "brand")) -> CatalogSnapshot:
+    """catalog as a CatalogSnapshot; a DataFrame is snapshotted on every call
+
+    No cache keyed on the frame, since an in-place edit would go unnoticed.
+    Build one CatalogSnapshot and pass it in to reuse it across calls.
+    """
+    return catalog if isinstance(catalog, CatalogSnapshot) else CatalogSnapshot(catalog, dims)
+
+
+def diversity_at_k(retrieved: List[str], catalog, k: int,
+                   dimension: str = "category", top_idx: np.ndarray = None,
+                   column: np.ndarray = None) -> float:
+    """How diverse are results (unique brands/categories)
+
+    catalog is a CatalogSnapshot (or a DataFrame, snapshotted per call). Pass
+    top_idx (catalog rows of retrieved) and column (lowercased values of
+    dimension per catalog row) if they're already at hand.
+    """
+    if k <= 0 or not len(retrieved):
+        return 0.0
 
+    if top_idx is None or column is None:
+        snapshot = _snapshot(catalog, (dimension,))
+        top_idx = snapshot.rows(retrieved[:k]) if top_idx is None else top_idx
+        column = snapshot.columns[dimension]
 
-def diversity_at_k(retrieved: List[str], catalog_df, k: int,
-                   dimension: str = "category") -> float:
-    """How diverse are results (unique brands/categories)"""
-    if k <= 0 or not retrieved:
-        return 0.0
+    return diversity_from_values(column[top_idx[:k]].tolist(), k)
 
-    top_k = retrieved[:k]
-    values = []
-    for pid in top_k:
-        rows = catalog_df[catalog_df["id"] == pid]
-        if not rows.empty:
-            val = rows.iloc[0].get(dimension, "")
-            if val:
-                values.append(str(val).lower())
-
-    if not values:
+
+def diversity_from_values(values: List[str], k: int) -> float:
+    """diversity_at_k over already looked-up values (blank = unknown)
+
+    Look a query's values up once to max(k), then call this per k.
+    """
+    values = [v for v in values[:k] if v]
+    if k <= 0 or not values:
         return 0.0
 
     unique_count = len(set(values))
     return unique_count / min(k, len(values))
 
 
-def category_coverage(retrieved: List[str], catalog_df,
-                      expected_category: str = None) -> float:
-    """Fraction of results in the expected category"""
-    if not expected_category or not retrieved:
+def category_coverage(retrieved: List[str], catalog,
+                      expected_category: str = None, top_idx: np.ndarray = None,
+                      column: np.ndarray = None) -> float:
+    """Fraction of results in the expected category
+
+    catalog/top_idx/column work as in diversity_at_k.
+    """
+    if not expected_category or not len(retrieved):
         return 1.0
 
-    in_category = 0
-    for pid in retrieved:
-        rows = catalog_df[catalog_df["id"] == pid]
-        if not rows.empty:
-            cat = str(rows.iloc[0].get("category", "")).lower()
-            if expected_category.lower() in cat:
-                in_category += 1
+    if top_idx is None or column is None:
+        snapshot = _snapshot(catalog)
+        top_idx = snapshot.rows(retrieved) if top_idx is None else top_idx
+        column = snapshot.category
 
-    return in_category / len(retrieved) if retrieved else 0.0
+    in_category = int((np.char.find(column[top_idx], expected_category.lower()) >= 0).sum())
+    return in_category / len(retrieved)
 
 
-def calculate_all_metrics(relevant: Set[str], retrieved: List[str],
-                          catalog_df, k_values: List[int] = [1, 3, 5, 8],
-                          expected_category: str = None) -> Dict[str, Any]:
-    """Run all metrics for a query"""
-    metrics = {}
+def rank_metrics_from_hits(hits: np.ndarray, n_relevant: int,
+                           k_values: List[int] = [1, 3, 5, 8]) -> Tuple[List[Tuple[float, ...]], float, float]:
+    """Rank metrics from a hit vector over the whole result list
 
+    hits is 0/1 per retrieved position, e.g. snapshot.relevant_mask(relevant)[rows]
+    or _hits_cumsum. Returns ([(precision, recall, f1, ndcg, hit_rate) per k],
+    mrr, map); per-k values are reads at position k-1 of running totals.
+    """
+    hits = np.asarray(hits, dtype=np.int32)
+    n = len(hits)
+    kmax = max(k_values, default=0)
+    cum = np.cumsum(hits)
+    dcg = np.cumsum(hits * _discounts(n))
+    idcg = np.cumsum(_discounts(max(kmax, 0)))
+
+    rank = []
     for k in k_values:
-        metrics[f"precision@{k}"] = precision_at_k(relevant, retrieved, k)
-        metrics[f"recall@{k}"] = recall_at_k(relevant, retrieved, k)
-        metrics[f"f1@{k}"] = f1_at_k(relevant, retrieved, k)
-        metrics[f"ndcg@{k}"] = ndcg_at_k(relevant, retrieved, k)
-        metrics[f"hit_rate@{k}"] = hit_rate_at_k(relevant, retrieved, k)
-        metrics[f"diversity_category@{k}"] = diversity_at_k(retrieved, catalog_df, k, "category")
-        metrics[f"diversity_brand@{k}"] = diversity_at_k(retrieved, catalog_df, k, "brand")
+        found = _found_at(cum, k)
+        prec = found / k if k > 0 and n else 0.0
+        rec = found / n_relevant if n_relevant and k > 0 else 0.0
+        ideal = _found_at(idcg, min(k, n_relevant), float)
+        ndcg = _found_at(dcg, k, float) / ideal if ideal > 0 and n else 0.0
+        rank.append((prec, rec, _f1(prec, rec), ndcg, 1.0 if found > 0 else 0.0))
+
+    positions = np.flatnonzero(hits)
+    map_score = float((cum[positions] / (positions + 1)).sum()) / n_relevant if n_relevant and len(positions) else 0.0
+    return rank, _mrr_from_hits(hits), map_score
+
 
-    metrics["mrr"] = mean_reciprocal_rank(relevant, retrieved)
-    metrics["map"] = mean_average_precision(relevant, retrieved)
+def calculate_all_metrics(relevant: Set[str], retrieved: List[str],
+                          catalog, k_values: List[int] = [1, 3, 5, 8],
+                          expected_category: str = None, top_idx: np.ndarray = None,
+                          columns: Dict[str, np.ndarray] = None) -> Dict[str, Any]:
+    """Run all metrics for a query
+
+    catalog is a CatalogSnapshot built once for the eval; a DataFrame still
+    works but is snapshotted on every call. top_idx/columns (catalog rows of
+    retrieved, lowercased "brand"/"category" per row) skip the id lookups.
+    """
+    columns = columns or {}
+    if top_idx is None or "category" not in columns or "brand" not in columns:
+        snapshot = _snapshot(catalog)
+        top_idx = snapshot.rows(retrieved) if top_idx is None else top_idx
+        columns = snapshot.columns
+    cat_col = columns["category"]
+    metrics = {}
+    kmax = max(k_values, default=0)
+
+    # Category/brand of each result looked up once, sliced per k below
+    cats = cat_col[top_idx[:kmax]].tolist()
+    brands = columns["brand"][top_idx[:kmax]].tolist()
+
+    if HAVE_NUMBA:
+        # Rank metrics from the compiled kernel over int-encoded ids
+        encoded, mask, n_relevant = encode_query(relevant, retrieved)
+        values = compute_metrics(encoded, mask, n_relevant,
+                                 np.asarray(k_values, dtype=np.int64)).tolist()
+        rank = [values[j * METRICS_PER_K:(j + 1) * METRICS_PER_K] for j in range(len(k_values))]
+        mrr, map_score = values[-2], values[-1]
+    else:
+        # One membership pass over the whole list, everything else reads the hits
+        hits, _ = _hits_cumsum(relevant, retrieved, len(retrieved))
+        rank, mrr, map_score = rank_metrics_from_hits(hits, len(relevant), k_values)
+
+    for k, (prec, rec, f1, ndcg, hit) in zip(k_values, rank):
+        metrics[f"precision@{k}"] = prec
+        metrics[f"recall@{k}"] = rec
+        metrics[f"f1@{k}"] = f1
+        metrics[f"ndcg@{k}"] = ndcg
+        metrics[f"hit_rate@{k}"] = hit
+        metrics[f"diversity_category@{k}"] = diversity_from_values(cats, k)
+        metrics[f"diversity_brand@{k}"] = diversity_from_values(brands, k)
+
+    metrics["mrr"] = mrr
+    metrics["map"] = map_score
 
     if expected_category:
-        metrics["category_coverage"] = category_coverage(retrieved, catalog_df, expected_category)
+        metrics["category_coverage"] = category_coverage(retrieved, catalog, expected_category, top_idx, cat_col)
 
     return metrics
 
 
 def aggregate_metrics(all_query_metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Aggregate results across queries"""
+    """Aggregate results across queries
+
+    Builds one (queries x metrics) float matrix, NaN where a query lacks a
+    metric or it isn't a number, and reduces every column at once.
+    """
     if not all_query_metrics:
         return {}
 
-    metric_values = defaultdict(list)
-    for query_metrics in all_query_metrics:
-        for metric_name, value in query_metrics.items():
-            if isinstance(value, (int, float)):
-                metric_values[metric_name].append(value)
+    df = pd.DataFrame(all_query_metrics)
+    for name in df.columns[df.dtypes == object]:
+        col = df[name]
+        df[name] = col.where(col.map(lambda v: isinstance(v, (int, float)))).astype(float)
+    df = df.select_dtypes(include=[np.number, "bool"]).dropna(axis=1, how="all")
+    if df.empty:
+        return {}
 
-    aggregated = {}
-    for metric_name, values in metric_values.items():
-        values_array = np.array(values)
-        aggregated[metric_name] = {
-            "mean": float(np.mean(values_array)),
-            "std": float(np.std(values_array)),
-            "min": float(np.min(values_array)),
-            "max": float(np.max(values_array)),
-            "median": float(np.median(values_array)),
-        }
+    values = df.to_numpy(dtype=np.float64)
+    stats = {
+        "mean": np.nanmean(values, axis=0).tolist(),
+        "std": np.nanstd(values, axis=0).tolist(),
+        "min": np.nanmin(values, axis=0).tolist(),
+        "max": np.nanmax(values, axis=0).tolist(),
+        "median": np.nanmedian(values, axis=0).tolist(),
+    }
 
-    return aggregated
+    return {
+        metric_name: {stat: column[j] for stat, column in stats.items()}
+        for j, metric_name in enumerate(df.columns)
+    }
 
 
 def confusion_matrix_metrics(y_true: List[str], y_pred: List[str],
@@ -185,33 +371,31 @@ def confusion_matrix_metrics(y_true: List[str], y_pred: List[str],
 
     label_to_idx = {label: i for i, label in enumerate(labels)}
     n = len(labels)
-    conf_matrix = np.zeros((n, n), dtype=int)
+    m = len(y_true)
 
-    for true_label, pred_label in zip(y_true, y_pred):
-        if true_label in label_to_idx and pred_label in label_to_idx:
-            i = label_to_idx[true_label]
-            j = label_to_idx[pred_label]
-            conf_matrix[i, j] += 1
+    # Label -> index once, then count flattened (true, pred) cells in one
+    # bincount (unknown labels dropped)
+    yt = np.fromiter((label_to_idx.get(t, -1) for t in y_true), dtype=np.int64, count=m)
+    yp = np.fromiter((label_to_idx.get(p, -1) for p in y_pred), dtype=np.int64, count=m)
+    known = (yt >= 0) & (yp >= 0)
+    conf_matrix = np.bincount(yt[known] * n + yp[known], minlength=n * n).reshape(n, n)
 
     correct = sum(1 for t, p in zip(y_true, y_pred) if t == p)
-    accuracy = correct / len(y_true)
-
-    per_class = {}
-    for i, label in enumerate(labels):
-        tp = conf_matrix[i, i]
-        fp = conf_matrix[:, i].sum() - tp
-        fn = conf_matrix[i, :].sum() - tp
-
-        precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-        recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-        f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
-
-        per_class[label] = {
-            "precision": precision,
-            "recall": recall,
-            "f1": f1,
-            "support": int(conf_matrix[i, :].sum())
-        }
+    accuracy = correct / m
+
+    tp = np.diag(conf_matrix)
+    pred_totals = conf_matrix.sum(axis=0)
+    true_totals = conf_matrix.sum(axis=1)
+    precision = np.where(pred_totals > 0, tp / np.maximum(pred_totals, 1), 0.0)
+    recall = np.where(true_totals > 0, tp / np.maximum(true_totals, 1), 0.0)
+    denom = precision + recall
+    f1 = np.where(denom > 0, 2 * precision * recall / np.where(denom > 0, denom, 1.0), 0.0)
+
+    per_class = {
+        label: {"precision": p, "recall": r, "f1": f, "support": sup}
+        for label, p, r, f, sup in zip(labels, precision.tolist(), recall.tolist(),
+                                       f1.tolist(), true_totals.tolist())
+    }
 
     return {
         "accuracy": accuracy,
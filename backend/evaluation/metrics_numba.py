@@ -0,0 +1,116 @@
+"""Compiled kernels for the per-query retrieval metrics
+
+Same math as metrics.py, but over catalog row indices and a boolean relevance
+mask instead of id lists and sets. Falls back to plain Python if numba isn't
+installed.
+"""
+import numpy as np
+
+try:
+    from numba import njit  # pragma: no cover
+    HAVE_NUMBA = True
+except Exception:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # No numba, run the loops as ordinary Python
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+# Per K: precision, recall, f1, ndcg, hit_rate; then mrr and map at the end
+METRICS_PER_K = 5
+
+
+@njit(cache=True)
+def compute_metrics(retrieved, relevant_mask, n_relevant, k_arr):
+    """Retrieval metrics for one query
+
+    retrieved: int64 row indices in rank order
+    relevant_mask: bool per catalog row
+    n_relevant: size of the relevant set (may include ids not in the catalog)
+    k_arr: int64 cutoffs
+
+    Returns float64 array of len(k_arr) * METRICS_PER_K + 2.
+    """
+    n = retrieved.shape[0]
+    nk = k_arr.shape[0]
+    out = np.zeros(nk * METRICS_PER_K + 2)
+
+    hits = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        hits[i] = relevant_mask[retrieved[i]]
+
+    for j in range(nk):
+        k = k_arr[j]
+        if k <= 0:
+            continue
+        m = min(k, n)
+        found = 0
+        dcg = 0.0
+        for i in range(m):
+            if hits[i]:
+                found += 1
+                dcg += 1.0 / np.log2(i + 2)
+
+        prec = found / k if n > 0 else 0.0
+        rec = found / n_relevant if n_relevant > 0 else 0.0
+        f1 = 2 * (prec * rec) / (prec + rec) if prec + rec > 0 else 0.0
+
+        idcg = 0.0
+        for i in range(min(k, n_relevant)):
+            idcg += 1.0 / np.log2(i + 2)
+        ndcg = dcg / idcg if n > 0 and idcg > 0 else 0.0
+
+        base = j * METRICS_PER_K
+        out[base] = prec
+        out[base + 1] = rec
+        out[base + 2] = f1
+        out[base + 3] = ndcg
+        out[base + 4] = 1.0 if found > 0 else 0.0
+
+    # MRR and MAP over the whole retrieved list
+    mrr = 0.0
+    seen = 0
+    ap = 0.0
+    for i in range(n):
+        if hits[i]:
+            if seen == 0:
+                mrr = 1.0 / (i + 1)
+            seen += 1
+            ap += seen / (i + 1)
+
+    out[nk * METRICS_PER_K] = mrr
+    out[nk * METRICS_PER_K + 1] = ap / n_relevant if n_relevant > 0 and seen > 0 else 0.0
+    return out
+
+
+def encode_query(relevant, retrieved):
+    """Map one query's string ids onto a dense int space for compute_metrics
+
+    Returns (retrieved as int64 positions, relevance mask over those positions,
+    number of relevant ids). Only retrieved ids need a slot; relevant ids that
+    were never retrieved only count towards n_relevant.
+    """
+    n_relevant = len(relevant)
+    if not isinstance(relevant, (set, frozenset)):
+        relevant = frozenset(relevant)
+    contains = relevant.__contains__
+    ids = {}
+    encoded = np.fromiter((ids.setdefault(pid, len(ids)) for pid in retrieved),
+                          dtype=np.int64, count=len(retrieved))
+    mask = np.fromiter((contains(pid) for pid in ids), dtype=np.bool_, count=len(ids))
+    return encoded, mask, n_relevant
+
+
+def warm_up():
+    """Compile compute_metrics (or load it from the on-disk cache) ahead of timing
+
+    Called by the evaluator on construction rather than at import, so importing
+    the metrics (e.g. from the API server) never pays for a compile. No-op
+    without numba.
+    """
+    if HAVE_NUMBA:  # pragma: no cover
+        compute_metrics(np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.bool_), 1,
+                        np.ones(1, dtype=np.int64))
@@ -1,23 +1,271 @@
 """HTML report generator for eval results"""
+import io
 import json
+import string
 from typing import Dict, Any, List
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import pyarrow.parquet as pq  # pragma: no cover
+except Exception:
+    pq = None
+
+
+# Static parts of the page, assembled into _PAGE once at import
+_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>AI Commerce Agent - Evaluation Report</title>
+    <style>
+"""
+
+_CSS = """        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            background: #f5f5f5;
+            padding: 20px;
+        }
+
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            padding: 40px;
+            border-radius: 8px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        }
+
+        h1 {
+            color: #2c3e50;
+            margin-bottom: 10px;
+            font-size: 2.5em;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 15px;
+        }
+
+        h2 {
+            color: #34495e;
+            margin-top: 40px;
+            margin-bottom: 20px;
+            font-size: 1.8em;
+            border-bottom: 2px solid #ecf0f1;
+            padding-bottom: 10px;
+        }
+
+        h3 {
+            color: #7f8c8d;
+            margin-top: 25px;
+            margin-bottom: 15px;
+            font-size: 1.3em;
+        }
+
+        section {
+            margin-bottom: 40px;
+        }
+
+        .summary {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 30px;
+            border-radius: 8px;
+            margin-bottom: 40px;
+        }
+
+        .summary h2, .summary h3 {
+            color: white;
+            border-bottom: 2px solid rgba(255,255,255,0.3);
+        }
+
+        .info-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 15px;
+            margin: 20px 0;
+        }
+
+        .metrics-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
+            gap: 20px;
+            margin-top: 20px;
+        }
+
+        .metric-card {
+            background: rgba(255, 255, 255, 0.15);
+            padding: 20px;
+            border-radius: 8px;
+            text-align: center;
+            backdrop-filter: blur(10px);
+        }
+
+        .metric-label {
+            font-size: 0.9em;
+            opacity: 0.9;
+            margin-bottom: 8px;
+        }
+
+        .metric-value {
+            font-size: 1.8em;
+            font-weight: bold;
+        }
+
+        .metric-highlight {
+            background: #3498db;
+            color: white;
+            padding: 15px 20px;
+            border-radius: 6px;
+            display: inline-block;
+            font-size: 1.2em;
+            font-weight: bold;
+            margin: 15px 0;
+        }
+
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 20px 0;
+            background: white;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+        }
+
+        thead {
+            background: #34495e;
+            color: white;
+        }
+
+        th, td {
+            padding: 12px 15px;
+            text-align: left;
+            border-bottom: 1px solid #ecf0f1;
+        }
+
+        tbody tr:hover {
+            background: #f8f9fa;
+        }
+
+        tbody tr:nth-child(even) {
+            background: #fafafa;
+        }
+
+        code {
+            background: #ecf0f1;
+            padding: 2px 6px;
+            border-radius: 3px;
+            font-family: 'Courier New', monospace;
+            font-size: 0.9em;
+        }
+
+        .error {
+            color: #e74c3c;
+            background: #fadbd8;
+            padding: 15px;
+            border-radius: 6px;
+            border-left: 4px solid #e74c3c;
+        }
+
+        .footer {
+            margin-top: 60px;
+            padding-top: 20px;
+            border-top: 2px solid #ecf0f1;
+            text-align: center;
+            color: #7f8c8d;
+            font-size: 0.9em;
+        }
+"""
+
+_BODY_OPEN = """    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>AI Commerce Agent - Evaluation Report</h1>
+        <p style="color: #7f8c8d; margin-bottom: 20px;">Hybrid Text + Image Recommendation System</p>
+"""
+
+_TABLE_END = """
+            </tbody>
+        </table>
+        """
+
+_FOOTER = """
+        <div class="footer">
+            <p>Generated on ${now}</p>
+            <p>AI Commerce Agent Evaluation Framework</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+# Whole page; the CSS has no "$" so it goes in verbatim
+_PAGE = string.Template(_HEAD + _CSS + _BODY_OPEN + "${summary}${sections}" + _FOOTER)
+
+
+def _format_default(value: float) -> str:
+    return f"{value:.4f}"
+
+
+# metric_type -> formatter; anything unknown falls back to _format_default
+_FORMATTERS = {
+    "percent": lambda value: f"{value * 100:.2f}%",
+    "ms": lambda value: f"{value:.2f}ms",
+    "qps": lambda value: f"{value:.1f} q/s",
+    "default": _format_default,
+}
+
+
+def _table_head(*columns: str) -> str:
+    """Opening <table> through <tbody> for the given column headers"""
+    cells = "".join(f"\n                    <th>{c}</th>" for c in columns)
+    return f"""
+        <table>
+            <thead>
+                <tr>{cells}
+                </tr>
+            </thead>
+            <tbody>
+        """
+
 
 class ReportGenerator:
+    __slots__ = ("results",)
+
+    # results key -> section builder; sections whose results are missing or
+    # empty are left out of the page instead of rendering "Not evaluated"
+    _SECTIONS = (
+        ("retrieval", "_generate_retrieval_section"),
+        ("intent_classification", "_generate_intent_section"),
+        ("filter_extraction", "_generate_filter_section"),
+        ("diversity", "_generate_diversity_section"),
+        ("performance", "_generate_performance_section"),
+    )
+
     def __init__(self, results: Dict[str, Any]):
         self.results = results
 
     def _format_metric(self, value: float, metric_type: str = "default") -> str:
-        if metric_type == "percent":
-            return f"{value * 100:.2f}%"
-        elif metric_type == "ms":
-            return f"{value:.2f}ms"
-        elif metric_type == "qps":
-            return f"{value:.1f} q/s"
-        else:
-            return f"{value:.4f}"
+        return _FORMATTERS.get(metric_type, _format_default)(value)
+
+    def _read_per_query(self, path: str, limit: int) -> List[Dict[str, Any]]:
+        """First rows of a per-query Parquet file written by the evaluator"""
+        if not path or pq is None or not Path(path).exists():
+            return []
+        rows = []
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=limit):
+            rows = batch.to_pylist()[:limit]
+            break
+        for row in rows:
+            row["metrics"] = json.loads(row["metrics"])
+        return rows
 
     def _generate_summary_section(self) -> str:
         metadata = self.results.get("metadata", {})
@@ -80,9 +328,17 @@ class ReportGenerator:
             return f'<section><h2>Retrieval Quality</h2><p class="error">Error: {retrieval.get("error", "Not evaluated")}</p></section>'
 
         aggregated = retrieval.get("aggregated", {})
+        fmt = _format_default
+
+        buf = io.StringIO()
+        buf.write(f"""
+        <section>
+            <h2>Retrieval Quality</h2>
+            <p>Evaluated on {retrieval.get('num_evaluated', 0)} queries</p>
+            <h3>Aggregated Metrics</h3>
+        """)
 
         # Build metrics table
-        rows = []
         metrics_order = [
             "precision@1", "precision@3", "precision@5", "precision@8",
             "recall@1", "recall@3", "recall@5", "recall@8",
@@ -90,81 +346,48 @@ class ReportGenerator:
             "mrr", "map"
         ]
 
+        buf.write(_table_head("Metric", "Mean", "Std Dev", "Min", "Max"))
         for metric_name in metrics_order:
             if metric_name in aggregated:
                 stats = aggregated[metric_name]
-                rows.append(f"""
+                buf.write(f"""
                 <tr>
                     <td>{metric_name}</td>
-                    <td>{self._format_metric(stats['mean'])}</td>
-                    <td>{self._format_metric(stats['std'])}</td>
-                    <td>{self._format_metric(stats['min'])}</td>
-                    <td>{self._format_metric(stats['max'])}</td>
+                    <td>{fmt(stats['mean'])}</td>
+                    <td>{fmt(stats['std'])}</td>
+                    <td>{fmt(stats['min'])}</td>
+                    <td>{fmt(stats['max'])}</td>
                 </tr>
                 """)
-
-        table_html = f"""
-        <table>
-            <thead>
-                <tr>
-                    <th>Metric</th>
-                    <th>Mean</th>
-                    <th>Std Dev</th>
-                    <th>Min</th>
-                    <th>Max</th>
-                </tr>
-            </thead>
-            <tbody>
-                {"".join(rows)}
-            </tbody>
-        </table>
-        """
+        buf.write(_TABLE_END)
 
         # Per-query results
-        per_query = retrieval.get("per_query", [])
-        per_query_rows = []
-        for result in per_query[:10]:  # Show first 10
-            query = result["query"][:60] + "..." if len(result["query"]) > 60 else result["query"]
-            metrics = result["metrics"]
-            per_query_rows.append(f"""
+        per_query = retrieval.get("per_query") or self._read_per_query(retrieval.get("per_query_path"), 10)
+        sample = per_query[:10]  # Show first 10
+        if sample:
+            buf.write("""
+        <h3>Sample Per-Query Results (Top 10)</h3>
+        """)
+            buf.write(_table_head("Query ID", "Query", "P@5", "R@5", "NDCG@5", "MRR"))
+            for result in sample:
+                query = result["query"][:60] + "..." if len(result["query"]) > 60 else result["query"]
+                metrics = result["metrics"]
+                buf.write(f"""
             <tr>
                 <td><code>{result['query_id']}</code></td>
                 <td>{query}</td>
-                <td>{self._format_metric(metrics.get('precision@5', 0))}</td>
-                <td>{self._format_metric(metrics.get('recall@5', 0))}</td>
-                <td>{self._format_metric(metrics.get('ndcg@5', 0))}</td>
-                <td>{self._format_metric(metrics.get('mrr', 0))}</td>
+                <td>{fmt(metrics.get('precision@5', 0))}</td>
+                <td>{fmt(metrics.get('recall@5', 0))}</td>
+                <td>{fmt(metrics.get('ndcg@5', 0))}</td>
+                <td>{fmt(metrics.get('mrr', 0))}</td>
             </tr>
             """)
+            buf.write(_TABLE_END)
 
-        per_query_html = f"""
-        <h3>Sample Per-Query Results (Top 10)</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Query ID</th>
-                    <th>Query</th>
-                    <th>P@5</th>
-                    <th>R@5</th>
-                    <th>NDCG@5</th>
-                    <th>MRR</th>
-                </tr>
-            </thead>
-            <tbody>
-                {"".join(per_query_rows)}
-            </tbody>
-        </table>
-        """
-
-        return f"""
-        <section>
-            <h2>Retrieval Quality</h2>
-            <p>Evaluated on {retrieval.get('num_evaluated', 0)} queries</p>
-            <h3>Aggregated Metrics</h3>
-            {table_html}
-            {per_query_html if per_query_rows else ""}
+        buf.write("""
         </section>
-        """
+        """)
+        return buf.getvalue()
 
     def _generate_intent_section(self) -> str:
         """Generate intent classification section."""
@@ -174,45 +397,34 @@ class ReportGenerator:
 
         accuracy = intent.get("accuracy", 0)
         per_class = intent.get("per_class", {})
+        fmt = _format_default
+
+        buf = io.StringIO()
+        buf.write(f"""
+        <section>
+            <h2>Intent Classification</h2>
+            <div class="metric-highlight">Overall Accuracy: {_FORMATTERS['percent'](accuracy)}</div>
+            <h3>Per-Class Metrics</h3>
+        """)
 
         # Per-class table
-        rows = []
+        buf.write(_table_head("Intent Type", "Precision", "Recall", "F1 Score", "Support"))
         for label, stats in per_class.items():
-            rows.append(f"""
+            buf.write(f"""
             <tr>
                 <td>{label}</td>
-                <td>{self._format_metric(stats['precision'])}</td>
-                <td>{self._format_metric(stats['recall'])}</td>
-                <td>{self._format_metric(stats['f1'])}</td>
+                <td>{fmt(stats['precision'])}</td>
+                <td>{fmt(stats['recall'])}</td>
+                <td>{fmt(stats['f1'])}</td>
                 <td>{stats['support']}</td>
             </tr>
             """)
+        buf.write(_TABLE_END)
 
-        table_html = f"""
-        <table>
-            <thead>
-                <tr>
-                    <th>Intent Type</th>
-                    <th>Precision</th>
-                    <th>Recall</th>
-                    <th>F1 Score</th>
-                    <th>Support</th>
-                </tr>
-            </thead>
-            <tbody>
-                {"".join(rows)}
-            </tbody>
-        </table>
-        """
-
-        return f"""
-        <section>
-            <h2>Intent Classification</h2>
-            <div class="metric-highlight">Overall Accuracy: {self._format_metric(accuracy, 'percent')}</div>
-            <h3>Per-Class Metrics</h3>
-            {table_html}
+        buf.write("""
         </section>
-        """
+        """)
+        return buf.getvalue()
 
     def _generate_filter_section(self) -> str:
         """Generate filter extraction section."""
@@ -222,39 +434,31 @@ class ReportGenerator:
 
         overall = filters.get("overall_accuracy", 0)
         per_filter = filters.get("per_filter_accuracy", {})
+        pct = _FORMATTERS['percent']
+
+        buf = io.StringIO()
+        buf.write(f"""
+        <section>
+            <h2>Filter Extraction</h2>
+            <div class="metric-highlight">Overall Accuracy: {pct(overall)}</div>
+            <h3>Per-Filter Accuracy</h3>
+        """)
 
         # Per-filter table
-        rows = []
+        buf.write(_table_head("Filter Type", "Accuracy"))
         for filter_type, accuracy in per_filter.items():
-            rows.append(f"""
+            buf.write(f"""
             <tr>
                 <td>{filter_type}</td>
-                <td>{self._format_metric(accuracy, 'percent')}</td>
+                <td>{pct(accuracy)}</td>
             </tr>
             """)
+        buf.write(_TABLE_END)
 
-        table_html = f"""
-        <table>
-            <thead>
-                <tr>
-                    <th>Filter Type</th>
-                    <th>Accuracy</th>
-                </tr>
-            </thead>
-            <tbody>
-                {"".join(rows)}
-            </tbody>
-        </table>
-        """
-
-        return f"""
-        <section>
-            <h2>Filter Extraction</h2>
-            <div class="metric-highlight">Overall Accuracy: {self._format_metric(overall, 'percent')}</div>
-            <h3>Per-Filter Accuracy</h3>
-            {table_html}
+        buf.write("""
         </section>
-        """
+        """)
+        return buf.getvalue()
 
     def _generate_diversity_section(self) -> str:
         """Generate diversity metrics section."""
@@ -263,38 +467,30 @@ class ReportGenerator:
             return f'<section><h2>Result Diversity</h2><p class="error">Error: {diversity.get("error", "Not evaluated")}</p></section>'
 
         aggregated = diversity.get("aggregated", {})
+        fmt = _format_default
 
-        rows = []
+        buf = io.StringIO()
+        buf.write(f"""
+        <section>
+            <h2>Result Diversity</h2>
+            <p>Evaluated on {diversity.get('num_queries', 0)} queries</p>
+        """)
+
+        buf.write(_table_head("Diversity Metric", "Mean Score"))
         for metric_name in sorted(aggregated.keys()):
             stats = aggregated[metric_name]
-            rows.append(f"""
+            buf.write(f"""
             <tr>
                 <td>{metric_name}</td>
-                <td>{self._format_metric(stats['mean'])}</td>
+                <td>{fmt(stats['mean'])}</td>
             </tr>
             """)
+        buf.write(_TABLE_END)
 
-        table_html = f"""
-        <table>
-            <thead>
-                <tr>
-                    <th>Diversity Metric</th>
-                    <th>Mean Score</th>
-                </tr>
-            </thead>
-            <tbody>
-                {"".join(rows)}
-            </tbody>
-        </table>
-        """
-
-        return f"""
-        <section>
-            <h2>Result Diversity</h2>
-            <p>Evaluated on {diversity.get('num_queries', 0)} queries</p>
-            {table_html}
+        buf.write("""
         </section>
-        """
+        """)
+        return buf.getvalue()
 
     def _generate_performance_section(self) -> str:
         """Generate performance benchmark section."""
@@ -311,37 +507,29 @@ class ReportGenerator:
             ("Max Latency", performance.get("max_latency_ms", 0), "ms"),
             ("Throughput", performance.get("throughput_qps", 0), "qps"),
         ]
+        fmt = self._format_metric
 
-        rows = []
+        buf = io.StringIO()
+        buf.write(f"""
+        <section>
+            <h2>Performance Benchmark</h2>
+            <p>Based on {performance.get('num_iterations', 0)} iterations</p>
+        """)
+
+        buf.write(_table_head("Metric", "Value"))
         for label, value, metric_type in metrics:
-            rows.append(f"""
+            buf.write(f"""
             <tr>
                 <td>{label}</td>
-                <td>{self._format_metric(value, metric_type)}</td>
+                <td>{fmt(value, metric_type)}</td>
             </tr>
             """)
+        buf.write(_TABLE_END)
 
-        table_html = f"""
-        <table>
-            <thead>
-                <tr>
-                    <th>Metric</th>
-                    <th>Value</th>
-                </tr>
-            </thead>
-            <tbody>
-                {"".join(rows)}
-            </tbody>
-        </table>
-        """
-
-        return f"""
-        <section>
-            <h2>Performance Benchmark</h2>
-            <p>Based on {performance.get('num_iterations', 0)} iterations</p>
-            {table_html}
+        buf.write("""
         </section>
-        """
+        """)
+        return buf.getvalue()
 
     def generate_html_report(self, output_path: str):
         """
@@ -350,209 +538,19 @@ class ReportGenerator:
         Args:
             output_path: Path to save HTML file
         """
-        # Generate all sections
-        summary = self._generate_summary_section()
-        retrieval = self._generate_retrieval_section()
-        intent = self._generate_intent_section()
-        filters = self._generate_filter_section()
-        diversity = self._generate_diversity_section()
-        performance = self._generate_performance_section()
-
-        # Complete HTML document
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI Commerce Agent - Evaluation Report</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f5f5f5;
-            padding: 20px;
-        }}
-
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            padding: 40px;
-            border-radius: 8px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-
-        h1 {{
-            color: #2c3e50;
-            margin-bottom: 10px;
-            font-size: 2.5em;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 15px;
-        }}
-
-        h2 {{
-            color: #34495e;
-            margin-top: 40px;
-            margin-bottom: 20px;
-            font-size: 1.8em;
-            border-bottom: 2px solid #ecf0f1;
-            padding-bottom: 10px;
-        }}
-
-        h3 {{
-            color: #7f8c8d;
-            margin-top: 25px;
-            margin-bottom: 15px;
-            font-size: 1.3em;
-        }}
-
-        section {{
-            margin-bottom: 40px;
-        }}
-
-        .summary {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            border-radius: 8px;
-            margin-bottom: 40px;
-        }}
-
-        .summary h2, .summary h3 {{
-            color: white;
-            border-bottom: 2px solid rgba(255,255,255,0.3);
-        }}
-
-        .info-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin: 20px 0;
-        }}
-
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-            gap: 20px;
-            margin-top: 20px;
-        }}
-
-        .metric-card {{
-            background: rgba(255, 255, 255, 0.15);
-            padding: 20px;
-            border-radius: 8px;
-            text-align: center;
-            backdrop-filter: blur(10px);
-        }}
-
-        .metric-label {{
-            font-size: 0.9em;
-            opacity: 0.9;
-            margin-bottom: 8px;
-        }}
-
-        .metric-value {{
-            font-size: 1.8em;
-            font-weight: bold;
-        }}
-
-        .metric-highlight {{
-            background: #3498db;
-            color: white;
-            padding: 15px 20px;
-            border-radius: 6px;
-            display: inline-block;
-            font-size: 1.2em;
-            font-weight: bold;
-            margin: 15px 0;
-        }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            background: white;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-        }}
-
-        thead {{
-            background: #34495e;
-            color: white;
-        }}
-
-        th, td {{
-            padding: 12px 15px;
-            text-align: left;
-            border-bottom: 1px solid #ecf0f1;
-        }}
-
-        tbody tr:hover {{
-            background: #f8f9fa;
-        }}
-
-        tbody tr:nth-child(even) {{
-            background: #fafafa;
-        }}
-
-        code {{
-            background: #ecf0f1;
-            padding: 2px 6px;
-            border-radius: 3px;
-            font-family: 'Courier New', monospace;
-            font-size: 0.9em;
-        }}
-
-        .error {{
-            color: #e74c3c;
-            background: #fadbd8;
-            padding: 15px;
-            border-radius: 6px;
-            border-left: 4px solid #e74c3c;
-        }}
-
-        .footer {{
-            margin-top: 60px;
-            padding-top: 20px;
-            border-top: 2px solid #ecf0f1;
-            text-align: center;
-            color: #7f8c8d;
-            font-size: 0.9em;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>AI Commerce Agent - Evaluation Report</h1>
-        <p style="color: #7f8c8d; margin-bottom: 20px;">Hybrid Text + Image Recommendation System</p>
-
-        {summary}
-        {retrieval}
-        {intent}
-        {filters}
-        {diversity}
-        {performance}
-
-        <div class="footer">
-            <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p>AI Commerce Agent Evaluation Framework</p>
-        </div>
-    </div>
-</body>
-</html>
-        """
+        # Generate the sections that have results
+        sections = [getattr(self, builder)() for key, builder in self._SECTIONS
+                    if self.results.get(key)]
+        html = _PAGE.substitute(
+            summary=self._generate_summary_section(),
+            sections="".join(sections),
+            now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        )
 
         # Save HTML file
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w') as f:
-            f.write(html)
+        out = Path(output_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(html, encoding="utf-8")
 
         print(f"[Report] HTML report generated: {output_path}")
-        print(f"[Report] Open in browser: file://{Path(output_path).absolute()}")
+        print(f"[Report] Open in browser: {out.resolve().as_uri()}")
@@ -1,9 +1,28 @@
 import os
 import sys
 
+import pandas as pd
+import pytest
+
 # Ensure the backend package root is importable as 'agent'
 TESTS_DIR = os.path.dirname(__file__)
 BACKEND_ROOT = os.path.abspath(os.path.join(TESTS_DIR, '..'))
 if BACKEND_ROOT not in sys.path:
     sys.path.insert(0, BACKEND_ROOT)
 
+
+
+# Simple product catalog shared by the filter tests (read-only, built once per module)
+@pytest.fixture(scope="module")
+def catalog_df():
+    return pd.DataFrame([
+        {"id": "a", "title": "Nike Tee", "description": "", "category": "t-shirt", "brand": "Nike", "price": 25.0, "currency": "USD", "image_url": "", "tags": "breathable,athletic"},
+        {"id": "b", "title": "Adidas Tee", "description": "", "category": "t-shirt", "brand": "Adidas", "price": 30.0, "currency": "USD", "image_url": "", "tags": "athletic"},
+        {"id": "c", "title": "Nike Hoodie", "description": "", "category": "hoodie", "brand": "Nike", "price": 45.0, "currency": "USD", "image_url": "", "tags": "warm"},
+    ])
+
+
+# Same catalog as plain dicts, for apply_filters_fast
+@pytest.fixture(scope="module")
+def catalog_records(catalog_df):
+    return catalog_df.to_dict("records")
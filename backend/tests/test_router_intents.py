@@ -1,4 +1,4 @@
-from agent.router import classify_intent, extract_filters_rules
+from agent.router import classify_intent, extract_filters_rules, extract_filters_rules_batch, smalltalk_reply
 
 # 1. Text-only query
 def test_intent_text():
@@ -18,3 +18,31 @@ def test_filter_rules_brand_price_category():
     assert f.brand == "Nike"
     assert f.category == "t-shirt"
     assert f.price_max == 25.0
+
+# Keywords only match whole words (plurals allowed)
+def test_filter_rules_whole_word_matching():
+    assert extract_filters_rules("what is your name").category is None
+    assert extract_filters_rules("warm hoodies").category == "hoodie"
+    assert extract_filters_rules("lightweight backpack for shoes").category == "backpack"
+
+# Batch extraction matches the single query path
+def test_filter_rules_batch():
+    queries = ["nike breathable t-shirt under $25", "warm hoodies", "nike breathable t-shirt under $25"]
+    batch = extract_filters_rules_batch(queries)
+    assert [f.model_dump() for f in batch] == [extract_filters_rules(q).model_dump() for q in queries]
+
+# Small talk keywords are whole tokens, "this" is not a greeting
+def test_smalltalk_token_match():
+    assert smalltalk_reply("hey there").startswith("Hi!")
+    assert not smalltalk_reply("is this on").startswith("Hi!")
+    assert smalltalk_reply("thank you so much").startswith("You're welcome")
+
+# A dash range wins even when a keyword sits right before its first number
+def test_filter_rules_dash_range_precedence():
+    for text, band in [("under 20-40", (20.0, 40.0)),
+                       ("below 30-50 dollars", (30.0, 50.0)),
+                       ("between 10 and 20-30", (20.0, 30.0)),
+                       ("between 40 and 20", (20.0, 40.0)),
+                       ("less than $15", (None, 15.0))]:
+        f = extract_filters_rules(text)
+        assert (f.price_min, f.price_max) == band, text
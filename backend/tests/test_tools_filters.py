@@ -1,34 +1,35 @@
-from agent.tools import apply_filters
+from agent.tools import apply_filters, apply_filters_fast
 from agent.models import FilterSpec
-import pandas as pd
-
-# Helper to make a simple product catalog dataframe
-def make_df():
-    return pd.DataFrame([
-        {"id": "a", "title": "Nike Tee", "description": "", "category": "t-shirt", "brand": "Nike", "price": 25.0, "currency": "USD", "image_url": "", "tags": "breathable,athletic"},
-        {"id": "b", "title": "Adidas Tee", "description": "", "category": "t-shirt", "brand": "Adidas", "price": 30.0, "currency": "USD", "image_url": "", "tags": "athletic"},
-        {"id": "c", "title": "Nike Hoodie", "description": "", "category": "hoodie", "brand": "Nike", "price": 45.0, "currency": "USD", "image_url": "", "tags": "warm"},
-    ])
 
 # Test various filtering scenarios
-def test_filters_by_brand_and_category():
-    df = make_df()
+def test_filters_by_brand_and_category(catalog_df):
     f = FilterSpec(brand="Nike", category="t-shirt")
-    out = apply_filters(df, f)
+    out = apply_filters(catalog_df, f)
     assert list(out["id"]) == ["a"]
 
 # Test price range filtering
-def test_filters_by_price_range():
-    df = make_df()
+def test_filters_by_price_range(catalog_df):
     f = FilterSpec(price_min=26, price_max=46)
-    out = apply_filters(df, f)
+    out = apply_filters(catalog_df, f)
     # items with price 30 and 45
     assert set(out["id"]) == {"b", "c"}
 
 # Test filtering by tags
-def test_filters_by_tags():
-    df = make_df()
+def test_filters_by_tags(catalog_df):
     f = FilterSpec(tags_contains="breathable")
-    out = apply_filters(df, f)
+    out = apply_filters(catalog_df, f)
     assert list(out["id"]) == ["a"]
 
+
+# The list-of-dicts path must agree with the DataFrame path
+def test_apply_filters_fast_matches_dataframe(catalog_df, catalog_records):
+    specs = [
+        FilterSpec(brand="nike", category="T-Shirt"),
+        FilterSpec(price_min=26, price_max=46),
+        FilterSpec(tags_contains="Athletic"),
+        FilterSpec(category="hood"),
+        FilterSpec(),
+    ]
+    for f in specs:
+        fast = [r["id"] for r in apply_filters_fast(catalog_records, f)]
+        assert fast == list(apply_filters(catalog_df, f)["id"])